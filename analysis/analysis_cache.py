@@ -0,0 +1,176 @@
+import os
+import pickle
+import sqlite3
+import logging
+import pandas as pd
+
+from product_loader import file_signature
+
+ANALYSIS_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "analysis_cache.db")
+# Bump when the derived rows change shape, so old caches are rebuilt.
+CACHE_VERSION = 2
+SOURCE_COLUMN = "source_file"
+REVIEW_FIELDS = ("brand", "product", "review", "sentiment_score", "sentiment_label")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    name  TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    path      TEXT PRIMARY KEY,
+    signature TEXT NOT NULL,
+    summary   BLOB
+);
+CREATE TABLE IF NOT EXISTS reviews (
+    path            TEXT NOT NULL,
+    brand           TEXT,
+    product         TEXT,
+    review          TEXT,
+    sentiment_score REAL,
+    sentiment_label TEXT
+);
+CREATE INDEX IF NOT EXISTS reviews_path ON reviews (path);
+"""
+
+class AnalysisCache:
+    """
+    Summary rows and scored review rows derived from each product file, stored
+    per file in SQLite and keyed by the file's signature (mtime and size).
+
+    `changed_files` tells which files are new or modified since their rows were
+    stored. `update` replaces the rows of a batch of recomputed files, and
+    `save` drops the rows of deleted files, so a run only writes the entries
+    that changed. `review_frames` streams the review rows back from disk in
+    chunks, so no run holds every review in memory. `key` identifies everything
+    else the rows depend on (e.g. the sentiment scorer and spec columns); a
+    cache built with another key is cleared.
+    """
+
+    def __init__(self, path=ANALYSIS_CACHE_PATH, key=None):
+        self.path = path
+        self.key = repr((CACHE_VERSION, key))
+        self._current = {}
+        self._changed = []
+        self._written = set()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'key'").fetchone()
+        if row is None or row[0] != self.key:
+            if row is not None:
+                logging.info("🔄 Analysis settings changed; rebuilding the analysis cache.")
+            self.clear()
+
+    def clear(self):
+        with self._conn:
+            self._conn.execute("DELETE FROM files")
+            self._conn.execute("DELETE FROM reviews")
+            self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('key', ?)", (self.key,))
+
+    def changed_files(self, paths):
+        """
+        The paths (in order) whose signature differs from the stored one.
+        """
+        stored = dict(self._conn.execute("SELECT path, signature FROM files"))
+        self._current = {}
+        for path in paths:
+            try:
+                self._current[path] = file_signature(path)
+            except OSError as e:
+                logging.warning(f"Could not stat {os.path.basename(path)}: {e}")
+        self._changed = [path for path, signature in self._current.items() if stored.get(path) != signature]
+        self._written = set()
+        return self._changed
+
+    def update(self, summary_df, reviews_df):
+        """
+        Replaces the stored rows of the files in `summary_df`/`reviews_df` (which
+        carry a SOURCE_COLUMN) with these rows, in one transaction.
+        """
+        paths = set()
+        for df in (summary_df, reviews_df):
+            if SOURCE_COLUMN in df.columns:
+                paths.update(df[SOURCE_COLUMN].dropna().unique())
+        if not paths:
+            return
+
+        with self._conn:
+            self._conn.executemany("DELETE FROM reviews WHERE path = ?", [(path,) for path in paths])
+            for path in paths:
+                rows = summary_df[summary_df[SOURCE_COLUMN] == path] if SOURCE_COLUMN in summary_df.columns else None
+                summary = pickle.dumps(rows.reset_index(drop=True), protocol=pickle.HIGHEST_PROTOCOL) \
+                    if rows is not None and not rows.empty else None
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO files (path, signature, summary) VALUES (?, ?, ?)",
+                    (path, self._current.get(path, ""), summary),
+                )
+            if not reviews_df.empty:
+                self._conn.executemany(
+                    f"INSERT INTO reviews (path, {', '.join(REVIEW_FIELDS)}) VALUES (?{', ?' * len(REVIEW_FIELDS)})",
+                    reviews_df[[SOURCE_COLUMN, *REVIEW_FIELDS]].itertuples(index=False, name=None),
+                )
+        self._written.update(paths)
+
+    def save(self):
+        """
+        Drops the rows of files that no longer exist and records the signatures
+        of changed files that yielded no rows (e.g. unreadable ones).
+        """
+        gone = [(path,) for (path,) in self._conn.execute("SELECT path FROM files") if path not in self._current]
+        empty = [path for path in self._changed if path not in self._written]
+        with self._conn:
+            for table in ("files", "reviews"):
+                self._conn.executemany(f"DELETE FROM {table} WHERE path = ?", gone)
+            self._conn.executemany("DELETE FROM reviews WHERE path = ?", [(path,) for path in empty])
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO files (path, signature, summary) VALUES (?, ?, NULL)",
+                [(path, self._current[path]) for path in empty],
+            )
+        logging.info(
+            f"✅ Analysis cache saved to {self.path} ({len(self._current)} files; "
+            f"{len(self._changed)} re-derived, {len(gone)} dropped)."
+        )
+
+    def summary_df(self):
+        """
+        The stored summary rows in file order, shaped like `create_product_summary_df` output.
+        """
+        frames = [
+            pickle.loads(blob)
+            for (blob,) in self._conn.execute("SELECT summary FROM files WHERE summary IS NOT NULL ORDER BY path")
+        ]
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True).drop(columns=[SOURCE_COLUMN], errors="ignore")
+        cols = df.columns.tolist()
+        if "brand" in cols:
+            cols.insert(0, cols.pop(cols.index("brand")))
+            df = df[cols]
+        return df
+
+    def review_frames(self, batch_size):
+        """
+        Yields the stored review rows (in file order) in chunks of `batch_size`.
+        """
+        cursor = self._conn.execute(
+            f"SELECT {', '.join(REVIEW_FIELDS)}, path FROM reviews ORDER BY path, rowid"
+        )
+        columns = [*REVIEW_FIELDS, SOURCE_COLUMN]
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield pd.DataFrame(rows, columns=columns)
+
+    def close(self):
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
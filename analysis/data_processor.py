@@ -1,22 +1,28 @@
 import os
-import json
+import sys
+import argparse
 import pandas as pd
 import logging
-from openpyxl import load_workbook
 from openpyxl.styles import PatternFill
 from openpyxl.formatting.rule import CellIsRule
 from openpyxl.worksheet.datavalidation import DataValidation
-from openpyxl.worksheet.table import Table, TableStyleInfo
-import string
 
-from textblob import TextBlob
-from openpyxl import load_workbook
-from openpyxl.styles import Font
-from wordcloud import WordCloud
 import matplotlib.pyplot as plt
-import pandas as pd
-import os
-from openpyxl.utils import get_column_letter
+from excel_report import ExcelReport
+from parquet_store import export_parquet, load_products_from_parquet
+from product_loader import BATCH_SIZE, LOAD_WORKERS, iter_batches, iter_product_files, iter_products, list_product_files
+from analysis_cache import SOURCE_COLUMN, AnalysisCache
+from spec_schema import SPEC_COLUMNS, extract_spec_columns, typed_spec_columns
+from sentiment import SCORERS, SENTIMENT_WORKERS, SentimentEngine, sentiment_label
+from wordclouds import TermCounts, render_word_clouds
+
+# Project root on the path so the crawler's config and utils (e.g. the price history store) import
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+from config import HISTORY_PATH
+from utils.history_store import PriceHistory
+from utils.url_utils import sku_from_url
 
 # Set up logging
 os.makedirs("logs", exist_ok=True)
@@ -29,93 +35,118 @@ logging.basicConfig(
 # Constants
 RAW_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "raw")
 SUMMARY_EXCEL_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "reports", "product_analysis.xlsx")
+EXCEL_CELL_LIMIT = 32767
+EXCEL_MAX_ROWS = 1048576
+REVIEW_COLUMNS = ["brand", "product", "review", "sentiment_score", "sentiment_label"]
 
-def create_review_analysis_sheet(df):
+def _score_reviews(batch, engine):
+    """
+    Sentiment rows for every non-empty review body in a batch of products,
+    scored in one call to the sentiment engine.
+    """
+    review_rows = []
+    for product in batch:
+        name = product.get("name") or ""
+        brand = name.split()[0] if name.split() else None
+        source = product.get(SOURCE_COLUMN)
+        reviews = product.get("all_reviews", [])
+        if isinstance(reviews, list):
+            for r in reviews:
+                body = (r.get("body") or "").strip()
+                if body:
+                    row = {"brand": brand, "product": name, "review": body}
+                    if source is not None:
+                        row[SOURCE_COLUMN] = source
+                    review_rows.append(row)
+
+    scores = engine.score([row["review"] for row in review_rows])
+    scored_rows = []
+    for row, polarity in zip(review_rows, scores):
+        if polarity is None:
+            continue
+        row["sentiment_score"] = polarity
+        row["sentiment_label"] = sentiment_label(polarity)
+        scored_rows.append(row)
+    return scored_rows
+
+def create_review_analysis_sheet(report, products, batch_size=BATCH_SIZE, engine=None, review_frames=None):
+    """
+    Scores reviews batch by batch. Each batch is streamed into the report's
+    Review Analysis sheet and the sentiment CSV, and folded into word counts for
+    the word clouds, so only one batch of review text is held at a time.
+    `engine` is a SentimentEngine (default: TextBlob with the persistent score cache).
+    `review_frames`, already scored review DataFrames (e.g. from the analysis
+    cache), replace scoring `products`.
+    """
     print("🔍 Running sentiment analysis...")
     logging.info("🔍 Starting review analysis.")
 
+    scoring = review_frames is None
+    own_engine = scoring and engine is None
+    if own_engine:
+        engine = SentimentEngine()
+    if scoring:
+        review_frames = (pd.DataFrame(_score_reviews(batch, engine)) for batch in iter_batches(products, batch_size))
+
     try:
         # ✅ Ensure the reports folder exists
         os.makedirs("reports", exist_ok=True)
+        csv_path = "reports/review_sentiment_data.csv"
+        if os.path.exists(csv_path):
+            os.remove(csv_path)
+
+        sheet = report.sheet("Review Analysis", REVIEW_COLUMNS)
+
+        scores = []
+        term_counts = TermCounts()
+
+        for reviews_df in review_frames:
+            if reviews_df.empty:
+                continue
 
-        review_rows = []
-        for _, row in df.iterrows():
-            name = row.get("name", "")
-            brand = row.get("brand", "")
-            reviews = row.get("all_reviews", [])
-            if isinstance(reviews, list):
-                for r in reviews:
-                    body = r.get("body", "").strip()
-                    if body:
-                        try:
-                            polarity = TextBlob(body).sentiment.polarity
-                        except Exception as e:
-                            logging.warning(f"Sentiment analysis failed for review: {body[:30]}... - {e}")
-                            continue
-                        label = "Positive" if polarity > 0.1 else "Negative" if polarity < -0.1 else "Neutral"
-                        review_rows.append({
-                            "brand": brand,
-                            "product": name,
-                            "review": body,
-                            "sentiment_score": polarity,
-                            "sentiment_label": label
-                        })
-
-        reviews_df = pd.DataFrame(review_rows)
-        if reviews_df.empty:
+            # ✅ Stream into the Excel sheet (up to Excel's row limit)
+            for row in reviews_df[REVIEW_COLUMNS].itertuples(index=False):
+                if sheet.rows >= EXCEL_MAX_ROWS - 1:
+                    break
+                sheet.append(row)
+
+            # ✅ Append raw sentiment data
+            try:
+                reviews_df[REVIEW_COLUMNS].to_csv(csv_path, mode="a", header=not scores, index=False)
+            except Exception as e:
+                logging.error(f"❌ Failed to save sentiment data CSV: {e}")
+
+            # ✅ Fold the batch into the word-cloud counts
+            term_counts.update(reviews_df)
+
+            scores.extend(reviews_df["sentiment_score"].tolist())
+
+        if scoring:
+            logging.info(f"✅ Sentiment: {engine.scored} reviews scored with {engine.scorer}, {engine.hits} from cache.")
+        if not scores:
             print("⚠️ No valid reviews found.")
             logging.warning("⚠️ No valid reviews found for sentiment analysis.")
             return
 
-        # ✅ Save to Excel sheet
-        try:
-            wb = load_workbook(SUMMARY_EXCEL_PATH)
-            if "Review Analysis" in wb.sheetnames:
-                del wb["Review Analysis"]
-            ws = wb.create_sheet("Review Analysis")
-
-            for col_idx, col in enumerate(reviews_df.columns, 1):
-                ws.cell(row=1, column=col_idx, value=col).font = Font(bold=True)
-            for row_idx, row in enumerate(reviews_df.itertuples(index=False), start=2):
-                for col_idx, value in enumerate(row, 1):
-                    ws.cell(row=row_idx, column=col_idx, value=value)
-
-            wb.save(SUMMARY_EXCEL_PATH)
-            print("✅ Review Analysis sheet created.")
-            logging.info("✅ Review Analysis sheet saved in Excel.")
-        except Exception as e:
-            logging.error(f"❌ Failed to write Review Analysis to Excel: {e}")
+        if sheet.rows < len(scores):
+            logging.warning(f"⚠️ Review Analysis sheet truncated to {sheet.rows} of {len(scores)} reviews; see {csv_path}.")
+        print("✅ Review Analysis sheet created.")
+        logging.info(f"✅ Review Analysis sheet written ({sheet.rows} rows).")
+        logging.info("✅ Review sentiment data saved to CSV.")
 
         # ✅ Generate word clouds
         print("☁️ Generating word clouds...")
-        for label, color in [("All", "cool"), ("Positive", "Greens"), ("Negative", "Reds")]:
-            try:
-                if label == "All":
-                    texts = reviews_df["review"]
-                else:
-                    texts = reviews_df[reviews_df["sentiment_label"] == label]["review"]
-
-                if not texts.empty:
-                    wc = WordCloud(width=800, height=400, background_color="white", colormap=color).generate(" ".join(texts))
-
-                    plt.figure(figsize=(10, 5))
-                    plt.imshow(wc, interpolation="bilinear")
-                    plt.axis("off")
-                    plt.title(f"{label} Reviews Word Cloud")
-                    plt.tight_layout()
-                    path = f"reports/{label.lower()}_wordcloud.png"
-                    plt.savefig(path)
-                    plt.close()
-                    logging.info(f"✅ Saved word cloud: {path}")
-                    print(f"✅ Saved word cloud: {path}")
-            except Exception as e:
-                logging.error(f"❌ Failed to generate word cloud for {label} reviews: {e}")
+        try:
+            term_counts.save()
+        except Exception as e:
+            logging.error(f"❌ Failed to save word counts: {e}")
+        render_word_clouds(term_counts)
 
         # ✅ Sentiment distribution plot
         try:
             print("📊 Generating sentiment score plot...")
             plt.figure(figsize=(8, 4))
-            reviews_df["sentiment_score"].hist(bins=20, color="skyblue")
+            pd.Series(scores).hist(bins=20, color="skyblue")
             plt.title("Sentiment Score Distribution")
             plt.xlabel("Sentiment Score")
             plt.ylabel("Review Count")
@@ -127,40 +158,46 @@ def create_review_analysis_sheet(df):
         except Exception as e:
             logging.error(f"❌ Failed to generate sentiment score distribution plot: {e}")
 
-        # ✅ Save raw sentiment data
-        try:
-            reviews_df.to_csv("reports/review_sentiment_data.csv", index=False)
-            logging.info("✅ Review sentiment data saved to CSV.")
-        except Exception as e:
-            logging.error(f"❌ Failed to save sentiment data CSV: {e}")
-
     except Exception as e:
         logging.error(f"❌ Unexpected error in create_review_analysis_sheet: {e}")
         print(f"❌ An unexpected error occurred: {e}")
+    finally:
+        if own_engine:
+            engine.close()
 
 
 def load_all_product_data():
     """
     Loads all product JSON files into a list of dictionaries.
     """
-    all_products = []
-    for file in os.listdir(RAW_DATA_DIR):
-        if file.endswith(".json"):
-            path = os.path.join(RAW_DATA_DIR, file)
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    all_products.append(data)
-            except Exception as e:
-                logging.warning(f"Failed to load {file}: {e}")
+    all_products = list(iter_products(RAW_DATA_DIR))
     logging.info(f"Loaded {len(all_products)} products from JSON.")
     return all_products
 
-def create_product_summary_df(products):
+def create_product_summary_df(products, batch_size=BATCH_SIZE):
     """
-    Transforms list of product dicts into a clean, analysis-ready DataFrame.
+    Transforms product dicts (a list, a generator or a DataFrame) into a clean,
+    analysis-ready DataFrame, one batch at a time so the nested specs and
+    reviews of only `batch_size` products are in memory at once.
     """
+    frames = [_summarise_batch(batch) for batch in iter_batches(products, batch_size)]
+    if not frames:
+        return pd.DataFrame()
+    df = pd.concat(frames, ignore_index=True)
+
+    # Reorder columns
+    cols = df.columns.tolist()
+    if "brand" in cols:
+        cols.insert(0, cols.pop(cols.index("brand")))
+        df = df[cols]
+
+    return df
+
+def _summarise_batch(products):
     df = pd.DataFrame(products)
+    for col in ("name", "price", "rating", "reviews", "full_specs", "all_reviews"):
+        if col not in df.columns:
+            df[col] = None
 
     # Clean up numeric fields
     df["price"] = pd.to_numeric(df["price"], errors="coerce")
@@ -171,123 +208,64 @@ def create_product_summary_df(products):
     # Extract brand from name
     df["brand"] = df["name"].str.split().str[0]
 
-    # Combine reviews
+    # Combine reviews (Excel keeps at most EXCEL_CELL_LIMIT characters per cell anyway)
     df["All_reviews"] = df["all_reviews"].apply(
         lambda reviews: " ".join(
-            [f"{i+1}. {r.get('body', '').strip()}" for i, r in enumerate(reviews)]
-        ) if isinstance(reviews, list) else ""
+            [f"{i+1}. {(r.get('body') or '').strip()}" for i, r in enumerate(reviews)]
+        )[:EXCEL_CELL_LIMIT] if isinstance(reviews, list) else ""
     )
 
-    # Extract specs
-    df["ram"] = df["full_specs"].apply(lambda x: x.get("System Memory (RAM)") if isinstance(x, dict) else None)
-    df["storage"] = df["full_specs"].apply(lambda x: x.get("Total Storage Capacity") if isinstance(x, dict) else None)
-    df["cpu"] = df["full_specs"].apply(lambda x: x.get("Processor Model") if isinstance(x, dict) else None)
-    df["model_number"] = df["full_specs"].apply(lambda x: x.get("Model Number") if isinstance(x, dict) else None)
-    df["year"] = df["full_specs"].apply(lambda x: x.get("Year of Release") if isinstance(x, dict) else None)
-    
-        # Extract specs using column names expected by spec comparison
-    df["system_memory_ram"] = df["full_specs"].apply(lambda x: x.get("System Memory (RAM)") if isinstance(x, dict) else None)
-    df["total_storage_capacity"] = df["full_specs"].apply(lambda x: x.get("Total Storage Capacity") if isinstance(x, dict) else None)
-    df["processor_model"] = df["full_specs"].apply(lambda x: x.get("Processor Model") if isinstance(x, dict) else None)
-    df["cpu_boost_clock_frequency"] = df["full_specs"].apply(lambda x: x.get("CPU Boost Clock Frequency") if isinstance(x, dict) else None)
-    df["number_of_cpu_cores"] = df["full_specs"].apply(lambda x: x.get("Number of CPU Cores") if isinstance(x, dict) else None)
-    df["screen_size"] = df["full_specs"].apply(lambda x: x.get("Screen Size") if isinstance(x, dict) else None)
-    df["screen_resolution"] = df["full_specs"].apply(lambda x: x.get("Screen Resolution") if isinstance(x, dict) else None)
-    df["refresh_rate"] = df["full_specs"].apply(lambda x: x.get("Refresh Rate") if isinstance(x, dict) else None)
-    df["brightness"] = df["full_specs"].apply(lambda x: x.get("Brightness") if isinstance(x, dict) else None)
-    df["graphics"] = df["full_specs"].apply(lambda x: x.get("Graphics") if isinstance(x, dict) else None)
-    df["gpu_brand"] = df["full_specs"].apply(lambda x: x.get("GPU Brand") if isinstance(x, dict) else None)
-    df["battery_life_up_to"] = df["full_specs"].apply(lambda x: x.get("Battery Life (up to)") if isinstance(x, dict) else None)
-    df["product_weight"] = df["full_specs"].apply(lambda x: x.get("Product Weight") if isinstance(x, dict) else None)
-    df["year_of_release"] = df["full_specs"].apply(lambda x: x.get("Year of Release") if isinstance(x, dict) else None)
-
-
-    # Drop bulky fields
-    df.drop(columns=["specs", "full_specs", "reviews"], errors="ignore", inplace=True)
-
-    # Reorder columns
-    cols = df.columns.tolist()
-    if "brand" in cols:
-        cols.insert(0, cols.pop(cols.index("brand")))
-        df = df[cols]
+    # Extract specs (one pass over the spec dicts; columns come from SPEC_COLUMNS)
+    spec_df = extract_spec_columns(df["full_specs"], index=df.index)
+    df = pd.concat([df.drop(columns=spec_df.columns, errors="ignore"), spec_df], axis=1)
 
+    # Drop bulky fields (the review stage streams all_reviews from the loader itself)
+    df.drop(columns=["specs", "full_specs", "reviews", "all_reviews"], errors="ignore", inplace=True)
     return df
 
-def save_summary_to_excel(df):
-    os.makedirs(os.path.dirname(SUMMARY_EXCEL_PATH), exist_ok=True)
+def update_analysis_cache(cache, raw_dir=RAW_DATA_DIR, engine=None, batch_size=BATCH_SIZE, workers=LOAD_WORKERS):
+    """
+    Recomputes the summary and review rows of the product files that changed
+    since the cache was built, in one pass over just those files, and stores
+    them in the cache batch by batch.
+    """
+    files = list_product_files(raw_dir)
+    changed = cache.changed_files(files)
+    print(f"♻️ {len(changed)} of {len(files)} product files changed since the last analysis.")
+    logging.info(f"♻️ Incremental analysis: {len(changed)} of {len(files)} product files changed.")
 
-    # Save Product Summary
-    df.to_excel(SUMMARY_EXCEL_PATH, sheet_name="Product Summary", index=False)
+    for batch in iter_batches(iter_product_files(changed, workers, source_key=SOURCE_COLUMN), batch_size):
+        cache.update(_summarise_batch(batch), pd.DataFrame(_score_reviews(batch, engine)))
+    cache.save()
 
-    # Load and format with openpyxl
-    wb = load_workbook(SUMMARY_EXCEL_PATH)
-    ws = wb["Product Summary"]
-    
-    # ✅ Format as Excel Table
-    last_col_letter = get_column_letter(ws.max_column)
-    table_ref = f"A1:{last_col_letter}{ws.max_row}"
-    table = Table(displayName="ProductSummaryTable", ref=table_ref)
+def create_summary_sheet(report, df):
+    """
+    Streams the summary DataFrame into the 'Product Summary' sheet as an Excel
+    table, with price highlighting and a brand dropdown.
+    """
+    sheet = report.sheet("Product Summary", df.columns)
+    sheet.append_frame(df)
 
     # ✅ Format as Excel Table
-    # table_ref = f"A1:{string.ascii_uppercase[ws.max_column - 1]}{ws.max_row}"
-    # table = Table(displayName="ProductSummaryTable", ref=table_ref)
-    style = TableStyleInfo(name="TableStyleMedium9", showFirstColumn=False,
-                           showLastColumn=False, showRowStripes=True, showColumnStripes=False)
-    table.tableStyleInfo = style
-    ws.add_table(table)
-
-    # ✅ Conditional formatting for price > 900
-    price_col = None
-    brand_col = None
-    for col in range(1, ws.max_column + 1):
-        header = ws.cell(row=1, column=col).value
-        if header == "price":
-            price_col = col
-        elif header == "brand":
-            brand_col = col
-
-    if price_col:
-        col_letter = string.ascii_uppercase[price_col - 1]
-        price_range = f"{col_letter}2:{col_letter}{ws.max_row}"
-
-        # Red fill for prices > 900
-        red_fill = PatternFill(start_color="FF9999", end_color="FF9999", fill_type="solid")
-        rule_red = CellIsRule(operator="greaterThan", formula=["900"], fill=red_fill)
-        ws.conditional_formatting.add(price_range, rule_red)
-
-        # Green fill for prices <= 900
-        green_fill = PatternFill(start_color="CCFFCC", end_color="CCFFCC", fill_type="solid")
-        rule_green = CellIsRule(operator="lessThanOrEqual", formula=["900"], fill=green_fill)
-        ws.conditional_formatting.add(price_range, rule_green)
+    sheet.add_table("ProductSummaryTable", "TableStyleMedium9")
+
+    # ✅ Conditional formatting on price: red for prices > 900, green for prices <= 900
+    red_fill = PatternFill(start_color="FF9999", end_color="FF9999", fill_type="solid")
+    green_fill = PatternFill(start_color="CCFFCC", end_color="CCFFCC", fill_type="solid")
+    sheet.add_conditional_format("price", CellIsRule(operator="greaterThan", formula=["900"], fill=red_fill))
+    sheet.add_conditional_format("price", CellIsRule(operator="lessThanOrEqual", formula=["900"], fill=green_fill))
 
     # ✅ Data validation dropdown for brand
-    if brand_col:
+    if "brand" in df.columns:
         unique_brands = list(df["brand"].dropna().unique())
         if unique_brands:
             brand_list = ",".join(unique_brands)
-            col_letter = string.ascii_uppercase[brand_col - 1]
-            dv_range = f"{col_letter}2:{col_letter}{ws.max_row}"
-            dv = DataValidation(type="list", formula1=f'"{brand_list}"', allow_blank=True)
-            ws.add_data_validation(dv)
-            dv.add(dv_range)
-
-    wb.save(SUMMARY_EXCEL_PATH)
-    logging.info(f"✅ Final Excel saved at {SUMMARY_EXCEL_PATH}")
-    print(f"✅ Excel file created: {SUMMARY_EXCEL_PATH}")
-    
-def create_spec_comparison_sheet(df):
-    import re
-    from openpyxl import load_workbook
-    from openpyxl.styles import PatternFill, Font
-    from openpyxl.worksheet.table import Table, TableStyleInfo
-    import string
-
-    # --- Reload workbook ---
-    wb = load_workbook(SUMMARY_EXCEL_PATH)
-    if "Specifications Comparison" in wb.sheetnames:
-        del wb["Specifications Comparison"]
-    ws = wb.create_sheet("Specifications Comparison")
+            sheet.add_validation("brand", DataValidation(type="list", formula1=f'"{brand_list}"', allow_blank=True))
 
+    logging.info(f"✅ Product Summary sheet written ({sheet.rows} rows).")
+    print("✅ Product Summary sheet created.")
+
+def create_spec_comparison_sheet(report, df):
     # --- Spec columns to compare ---
     spec_columns = [
         "brand", "name", "price", "rating", "system_memory_ram", "total_storage_capacity",
@@ -298,75 +276,173 @@ def create_spec_comparison_sheet(df):
     spec_columns = [col for col in spec_columns if col in df.columns]
 
     # --- Sort by price, rating, brand (if available) ---
-    sort_keys = [key for key in ["price", "rating", "brand"] if key in df.columns]
-    df = df.sort_values(by=sort_keys, ascending=[True, False, True])
-
-    # --- Write headers ---
-    for col_idx, col_name in enumerate(spec_columns, 1):
-        ws.cell(row=1, column=col_idx, value=col_name).font = Font(bold=True)
-
-    # --- Write data ---
-    for row_idx, row in enumerate(df[spec_columns].itertuples(index=False), start=2):
-        for col_idx, value in enumerate(row, 1):
-            ws.cell(row=row_idx, column=col_idx, value=value)
-
-    # --- Yellow fill for columns with unique values ---
-    for col_idx, col_name in enumerate(spec_columns, 1):
-        values = df[col_name].dropna().unique()
-        if len(values) > 1:
-            col_letter = string.ascii_uppercase[col_idx - 1]
-            yellow_fill = PatternFill(start_color="FFFACD", end_color="FFFACD", fill_type="solid")
-            for row in range(2, df.shape[0] + 2):
-                ws[f"{col_letter}{row}"].fill = yellow_fill
-
-    # --- Helper to extract first float number from a string ---
-    def extract_number(s):
-        match = re.search(r"([0-9.]+)", str(s))
-        return float(match.group(1)) if match else None
-
-    # --- Highlight best-in-class ---
-    def highlight_best(col_name, is_max=True, fill_color="CCFFCC"):
-        if col_name not in df.columns:
+    sort_order = {"price": True, "rating": False, "brand": True}
+    sort_keys = [key for key in sort_order if key in df.columns]
+    df = df.sort_values(by=sort_keys, ascending=[sort_order[key] for key in sort_keys]).reset_index(drop=True)
+
+    # --- Yellow for columns whose values differ between products ---
+    column_styles = {
+        idx: "varies" for idx, col_name in enumerate(spec_columns) if df[col_name].nunique(dropna=True) > 1
+    }
+    cell_styles = [dict(column_styles) for _ in range(len(df))]
+
+    # --- Highlight best-in-class, on spec strings as numbers in canonical units (GB, hours, pounds, ...) ---
+    typed = typed_spec_columns(df)
+
+    def highlight_best(col_name, is_max=True, style="best_high"):
+        if col_name not in typed.columns or col_name not in spec_columns:
             return
 
-        numeric_values = df[col_name].apply(extract_number)
+        numeric_values = typed[col_name]
         if numeric_values.isnull().all():
             return
 
         best_value = numeric_values.max() if is_max else numeric_values.min()
-        col_idx = spec_columns.index(col_name) + 1
-        col_letter = string.ascii_uppercase[col_idx - 1]
-
-        for i, val in enumerate(numeric_values, start=2):
-            if val == best_value:
-                ws[f"{col_letter}{i}"].fill = PatternFill(start_color=fill_color, end_color=fill_color, fill_type="solid")
-
-    # ✅ Highlight: Max RAM, Max Battery, Min Weight
-    highlight_best("system_memory_ram", is_max=True, fill_color="C6EFCE")       # Green
-    highlight_best("battery_life_up_to", is_max=True, fill_color="C6EFCE")      # Green
-    highlight_best("product_weight", is_max=False, fill_color="ADD8E6")         # Blue
-
-    # --- Add Excel Table ---
-    last_col = string.ascii_uppercase[len(spec_columns) - 1]
-    table_range = f"A1:{last_col}{df.shape[0] + 1}"
-    table = Table(displayName="SpecComparisonTable", ref=table_range)
-    style = TableStyleInfo(name="TableStyleMedium4", showRowStripes=True)
-    table.tableStyleInfo = style
-    ws.add_table(table)
-
-    wb.save(SUMMARY_EXCEL_PATH)
+        col_idx = spec_columns.index(col_name)
+        for i in numeric_values.index[numeric_values.eq(best_value)]:
+            cell_styles[i][col_idx] = style
+
+    # ✅ Highlight: Max RAM, Max Battery (green), Min Weight (blue)
+    highlight_best("system_memory_ram", is_max=True, style="best_high")
+    highlight_best("battery_life_up_to", is_max=True, style="best_high")
+    highlight_best("product_weight", is_max=False, style="best_low")
+
+    # --- Stream rows, then add the Excel Table ---
+    sheet = report.sheet("Specifications Comparison", spec_columns)
+    sheet.append_frame(df, cell_styles)
+    sheet.add_table("SpecComparisonTable", "TableStyleMedium4")
+
     logging.info("✅ Created 'Specifications Comparison' sheet with highlights.")
     print("✅ Specifications Comparison sheet created with table and highlights.")
 
+def create_price_change_sheet(report, df, window_days=30):
+    """
+    Adds a 'Price Changes' sheet computed from the price/rating history store:
+    latest vs previous crawl per SKU plus min/max over the last `window_days`.
+    """
+    history = PriceHistory(HISTORY_PATH)
+    changes = history.deltas()
+    if changes.empty:
+        print("⚠️ No price history recorded yet.")
+        logging.warning("⚠️ No price history found for the Price Changes sheet.")
+        return
+
+    stats = history.window_stats(days=window_days)[["sku", "min_price", "max_price"]]
+    changes = changes.merge(stats, on="sku", how="left")
+
+    # Names/brands from the summary, matched on the SKU in the product URL
+    names = df[["brand", "name", "product_url"]].copy()
+    names["sku"] = pd.to_numeric(
+        names["product_url"].map(lambda url: sku_from_url(url) if isinstance(url, str) else None), errors="coerce"
+    )
+    names = names.dropna(subset=["sku"]).astype({"sku": "int64"}).drop_duplicates("sku")
+    changes = changes.merge(names[["sku", "brand", "name"]], on="sku", how="left")
+
+    changes["last_seen"] = changes["ts"].dt.strftime("%Y-%m-%d %H:%M")
+    changes["previous_seen"] = changes["prev_ts"].dt.strftime("%Y-%m-%d %H:%M")
+    columns = {
+        "brand": "brand", "name": "name", "sku": "sku", "last_seen": "last_seen",
+        "price": "price", "prev_price": "previous_price", "price_change": "price_change",
+        "price_change_pct": "price_change_pct", "min_price": f"min_price_{window_days}d",
+        "max_price": f"max_price_{window_days}d", "rating": "rating", "rating_change": "rating_change",
+        "review_count": "review_count", "review_count_change": "review_count_change",
+        "previous_seen": "previous_seen",
+    }
+    sheet_df = changes.sort_values("price_change", na_position="last")[list(columns)].rename(columns=columns)
+
+    sheet = report.sheet("Price Changes", sheet_df.columns)
+    sheet.append_frame(sheet_df)
+
+    # Green for price drops, red for increases
+    sheet.add_conditional_format("price_change", CellIsRule(
+        operator="lessThan", formula=["0"], fill=PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
+    ))
+    sheet.add_conditional_format("price_change", CellIsRule(
+        operator="greaterThan", formula=["0"], fill=PatternFill(start_color="FF9999", end_color="FF9999", fill_type="solid")
+    ))
+
+    logging.info("✅ Created 'Price Changes' sheet from price history.")
+    print("✅ Price Changes sheet created.")
+
 
 
 
 if __name__ == "__main__":
-    products = load_all_product_data()
-    df_summary = create_product_summary_df(products)
+    parser = argparse.ArgumentParser(description="Build the product analysis workbook and charts.")
+    parser.add_argument(
+        "--source", choices=("json", "parquet"), default="json",
+        help="Read products from data/raw JSON (default) or the Parquet tables in data/parquet."
+    )
+    parser.add_argument(
+        "--crawl-date", action="append",
+        help="Parquet crawl date(s) to analyse (YYYY-MM-DD, repeatable; default: latest)."
+    )
+    parser.add_argument(
+        "--export-parquet", action="store_true",
+        help="Export data/raw JSON to Parquet tables partitioned by crawl date, then exit."
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=BATCH_SIZE,
+        help=f"Products per batch in the summary and review stages (default: {BATCH_SIZE})."
+    )
+    parser.add_argument(
+        "--load-workers", type=int, default=LOAD_WORKERS,
+        help=f"Threads reading and parsing JSON files (default: {LOAD_WORKERS})."
+    )
+    parser.add_argument(
+        "--sentiment-scorer", choices=sorted(SCORERS), default="textblob",
+        help="Review sentiment scorer: textblob (default) or the faster vader lexicon (needs vaderSentiment)."
+    )
+    parser.add_argument(
+        "--sentiment-workers", type=int, default=SENTIMENT_WORKERS,
+        help=f"Processes scoring reviews not yet in the sentiment cache (default: {SENTIMENT_WORKERS})."
+    )
+    parser.add_argument(
+        "--full", action="store_true",
+        help="Ignore the analysis cache and recompute every product (JSON source only)."
+    )
+    args = parser.parse_args()
+
+    if args.export_parquet:
+        export_parquet(load_all_product_data(), crawl_date=(args.crawl_date or [None])[-1])
+        raise SystemExit(0)
+
+    review_frames = None
+    cache = None
+    if args.source == "parquet":
+        parquet_products = load_products_from_parquet(dates=args.crawl_date)
+
+        def load_products():
+            return parquet_products
+
+        df_summary = create_product_summary_df(load_products(), batch_size=args.batch_size)
+    else:
+        # Only product files that changed since the last run are loaded and
+        # re-derived; everything else comes from the analysis cache
+        def load_products():
+            return iter_products(RAW_DATA_DIR, workers=args.load_workers)
+
+        cache = AnalysisCache(key=(args.sentiment_scorer, list(SPEC_COLUMNS.items())))
+        if args.full:
+            cache.clear()
+        with SentimentEngine(args.sentiment_scorer, processes=args.sentiment_workers) as engine:
+            update_analysis_cache(cache, RAW_DATA_DIR, engine, batch_size=args.batch_size, workers=args.load_workers)
+        df_summary = cache.summary_df()
+        review_frames = cache.review_frames(args.batch_size)
+
     print(df_summary.head(10))
     logging.info("✅ Product summary DataFrame created.")
     
-    save_summary_to_excel(df_summary)
-    create_spec_comparison_sheet(df_summary)
-    create_review_analysis_sheet(df_summary)
+    # One workbook, opened once in write-only mode and saved once
+    report = ExcelReport(SUMMARY_EXCEL_PATH)
+    create_summary_sheet(report, df_summary)
+    create_spec_comparison_sheet(report, df_summary)
+    create_price_change_sheet(report, df_summary)
+    with SentimentEngine(args.sentiment_scorer, processes=args.sentiment_workers) as engine:
+        create_review_analysis_sheet(
+            report, load_products(), batch_size=args.batch_size, engine=engine, review_frames=review_frames
+        )
+    report.save()
+    if cache:
+        cache.close()
+    print(f"✅ Excel file created: {SUMMARY_EXCEL_PATH}")
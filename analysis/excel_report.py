@@ -0,0 +1,132 @@
+import os
+import math
+import logging
+import warnings
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, NamedStyle, PatternFill
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.filters import AutoFilter
+from openpyxl.worksheet.table import Table, TableColumn, TableStyleInfo
+
+def _fill_style(name, color):
+    return NamedStyle(name=name, fill=PatternFill(start_color=color, end_color=color, fill_type="solid"))
+
+# Named styles shared by every sheet: each styled cell references one of these
+# instead of carrying its own Font/PatternFill.
+STYLES = (
+    NamedStyle(name="header", font=Font(bold=True)),
+    _fill_style("varies", "FFFACD"),     # yellow: spec differs between products
+    _fill_style("best_high", "C6EFCE"),  # green: best-in-class maximum
+    _fill_style("best_low", "ADD8E6"),   # blue: best-in-class minimum
+)
+
+def _cell_value(value):
+    # Excel has no NaN; pandas writes missing values as empty cells.
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    try:
+        if value != value:  # pd.NA/NaT-like values that are not floats
+            return None
+    except (TypeError, ValueError):
+        return None
+    return value
+
+class ReportSheet:
+    """
+    One write-only worksheet: a bold header row, then rows streamed with
+    `append`. Tables, conditional formats and validations that cover whole
+    columns are added once the row count is known (they are written when the
+    workbook is saved).
+    """
+
+    def __init__(self, report, title, columns):
+        self.report = report
+        self.title = title
+        self.columns = list(columns)
+        self.ws = report.wb.create_sheet(title)
+        self.rows = 0
+        self.ws.append([self._cell(name, "header") for name in self.columns])
+
+    def letter(self, column):
+        """
+        Column letter for a column name (any number of columns: A..Z, AA, AB, ...).
+        """
+        return get_column_letter(self.columns.index(column) + 1)
+
+    def column_range(self, column):
+        letter = self.letter(column)
+        return f"{letter}2:{letter}{self.rows + 1}"
+
+    def append(self, values, styles=None):
+        """
+        Streams one row. `styles` optionally maps column positions to named styles.
+        """
+        values = [_cell_value(value) for value in values]
+        if styles:
+            for idx, style in styles.items():
+                if style:
+                    values[idx] = self._cell(values[idx], style)
+        self.ws.append(values)
+        self.rows += 1
+
+    def append_frame(self, df, styles=None):
+        """
+        Streams the rows of a DataFrame that has (at least) this sheet's columns.
+        `styles`, if given, is a list with one {position: style} dict per row.
+        """
+        for i, row in enumerate(df[self.columns].itertuples(index=False)):
+            self.append(row, styles[i] if styles else None)
+
+    def add_table(self, name, style):
+        if not self.rows:
+            return
+        ref = f"A1:{get_column_letter(len(self.columns))}{self.rows + 1}"
+        table = Table(displayName=name, ref=ref, autoFilter=AutoFilter(ref=ref))
+        # Write-only sheets cannot be read back, so the table columns are named from the header here
+        table.tableColumns = [TableColumn(id=idx, name=str(column)) for idx, column in enumerate(self.columns, 1)]
+        table.tableStyleInfo = TableStyleInfo(name=style, showFirstColumn=False, showLastColumn=False,
+                                              showRowStripes=True, showColumnStripes=False)
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", message="In write-only mode you must add table columns manually")
+            self.ws.add_table(table)
+
+    def add_conditional_format(self, column, rule):
+        if self.rows and column in self.columns:
+            self.ws.conditional_formatting.add(self.column_range(column), rule)
+
+    def add_validation(self, column, validation):
+        if self.rows and column in self.columns:
+            self.ws.data_validations.append(validation)
+            validation.add(self.column_range(column))
+
+    def _cell(self, value, style):
+        cell = WriteOnlyCell(self.ws, value=value)
+        cell.style = style
+        return cell
+
+class ExcelReport:
+    """
+    The analysis workbook, built in one pass: sheets are created in write-only
+    mode and their rows streamed to disk as they are produced, then the
+    workbook is saved once (to a temporary file that replaces `path`, so a
+    failed run leaves the previous report intact).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.wb = Workbook(write_only=True)
+        for style in STYLES:
+            self.wb.add_named_style(style)
+        self.sheets = {}
+
+    def sheet(self, title, columns):
+        self.sheets[title] = ReportSheet(self, title, columns)
+        return self.sheets[title]
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        self.wb.save(tmp_path)
+        os.replace(tmp_path, self.path)
+        logging.info(f"✅ Report saved at {self.path} with sheets {list(self.sheets)}")
@@ -0,0 +1,130 @@
+import os
+import sys
+import shutil
+import logging
+from datetime import datetime, timezone
+import pandas as pd
+
+# Project root on the path so the crawler's URL helpers import
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+from utils.url_utils import sku_from_url
+
+PARQUET_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "parquet")
+TABLES = ("products", "specs", "reviews")
+PRODUCT_COLUMNS = ["sku", "name", "price", "rating", "reviews", "specs", "product_url"]
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Parquet export needs pyarrow: pip install pyarrow") from e
+
+def _product_skus(products_df):
+    # SKU from the product URL; fall back to the name for products without one.
+    sku = products_df["product_url"].map(lambda url: sku_from_url(url) if isinstance(url, str) else None)
+    return sku.astype("string").fillna(products_df["name"].astype("string"))
+
+def normalise_products(products):
+    """
+    Splits nested product dicts into flat `products`, `specs` and `reviews` DataFrames keyed by SKU.
+    """
+    products_df = pd.DataFrame(products)
+    for col in PRODUCT_COLUMNS[1:] + ["full_specs", "all_reviews"]:
+        if col not in products_df.columns:
+            products_df[col] = None
+    products_df["sku"] = _product_skus(products_df)
+
+    specs = products_df[["sku", "full_specs"]]
+    specs = specs[specs["full_specs"].map(lambda x: isinstance(x, dict))]
+    specs_df = pd.DataFrame(
+        [(sku, label, value) for sku, spec in zip(specs["sku"], specs["full_specs"]) for label, value in spec.items()],
+        columns=["sku", "label", "value"],
+    )
+
+    reviews = products_df[["sku", "all_reviews"]]
+    reviews = reviews[reviews["all_reviews"].map(lambda x: isinstance(x, list))]
+    reviews_df = pd.DataFrame(
+        [
+            (sku, idx, r.get("title"), r.get("body"), r.get("rating"))
+            for sku, items in zip(reviews["sku"], reviews["all_reviews"])
+            for idx, r in enumerate(items)
+        ],
+        columns=["sku", "position", "title", "body", "rating"],
+    )
+
+    products_df = products_df[PRODUCT_COLUMNS].astype({col: "string" for col in PRODUCT_COLUMNS})
+    return products_df, specs_df.astype("string"), reviews_df.astype({
+        "sku": "string", "title": "string", "body": "string", "rating": "string"
+    })
+
+def export_parquet(products, crawl_date=None, root=PARQUET_DIR):
+    """
+    Writes normalised products/specs/reviews tables under
+    <root>/<table>/crawl_date=YYYY-MM-DD/. Re-exporting a date replaces that partition.
+    """
+    _require_pyarrow()
+    crawl_date = crawl_date or datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    tables = dict(zip(TABLES, normalise_products(products)))
+
+    for name, df in tables.items():
+        partition = os.path.join(root, name, f"crawl_date={crawl_date}")
+        if os.path.isdir(partition):
+            shutil.rmtree(partition)
+        os.makedirs(partition, exist_ok=True)
+        df.to_parquet(os.path.join(partition, "part-0.parquet"), index=False)
+        logging.info(f"✅ Exported {len(df)} rows to {partition}")
+
+    print(f"✅ Parquet export for {crawl_date}: " + ", ".join(f"{n}={len(df)}" for n, df in tables.items()))
+    return crawl_date
+
+def crawl_dates(root=PARQUET_DIR):
+    path = os.path.join(root, "products")
+    if not os.path.isdir(path):
+        return []
+    return sorted(d.split("=", 1)[1] for d in os.listdir(path) if d.startswith("crawl_date="))
+
+def read_table(name, columns=None, dates=None, root=PARQUET_DIR):
+    """
+    Reads one table with column projection. `dates` limits the crawl-date partitions
+    read (default: the latest crawl; pass "all" for every crawl).
+    """
+    _require_pyarrow()
+    if dates is None:
+        available = crawl_dates(root)
+        if not available:
+            raise FileNotFoundError(f"No Parquet crawls under {root}")
+        dates = [available[-1]]
+    filters = None if dates == "all" else [("crawl_date", "in", list(dates))]
+    return pd.read_parquet(os.path.join(root, name), columns=columns, filters=filters)
+
+def load_products_from_parquet(dates=None, root=PARQUET_DIR):
+    """
+    Rebuilds the product records `create_product_summary_df` and
+    `create_review_analysis_sheet` consume, reading only the columns they use
+    (review titles and ratings are never loaded).
+    """
+    products = read_table("products", columns=PRODUCT_COLUMNS + ["crawl_date"], dates=dates, root=root)
+    specs = read_table("specs", columns=["sku", "label", "value", "crawl_date"], dates=dates, root=root)
+    reviews = read_table("reviews", columns=["sku", "position", "body", "crawl_date"], dates=dates, root=root)
+    for df in (products, specs, reviews):
+        df["crawl_date"] = df["crawl_date"].astype(str)
+
+    # Keyed by (sku, crawl_date) so reading several crawls keeps them apart.
+    spec_map = {
+        key: dict(zip(g["label"], g["value"]))
+        for key, g in specs.groupby(["sku", "crawl_date"], sort=False)
+    }
+    review_map = {
+        key: [{"body": body if isinstance(body, str) else ""} for body in g.sort_values("position")["body"]]
+        for key, g in reviews.groupby(["sku", "crawl_date"], sort=False)
+    }
+
+    keys = list(zip(products["sku"], products["crawl_date"]))
+    products = products.drop(columns=["sku"])
+    # Match the JSON layout: missing specs are "N/A", missing reviews an empty list.
+    products["full_specs"] = [spec_map.get(key, "N/A") for key in keys]
+    products["all_reviews"] = [review_map.get(key, []) for key in keys]
+    logging.info(f"Loaded {len(products)} products from Parquet.")
+    return products
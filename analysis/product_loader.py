@@ -0,0 +1,89 @@
+import os
+import json
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # optional speed-up; the standard library parser also accepts bytes
+    _loads = json.loads
+
+LOAD_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+BATCH_SIZE = 500
+
+def list_product_files(raw_dir):
+    return sorted(os.path.join(raw_dir, f) for f in os.listdir(raw_dir) if f.endswith(".json"))
+
+def _load_file(path):
+    try:
+        with open(path, "rb") as f:
+            return _loads(f.read())
+    except Exception as e:
+        logging.warning(f"Failed to load {os.path.basename(path)}: {e}")
+        return None
+
+def file_signature(path):
+    """
+    Cheap change marker for a product file: modification time and size.
+    """
+    st = os.stat(path)
+    return f"{st.st_mtime_ns}-{st.st_size}"
+
+def iter_products(raw_dir, workers=LOAD_WORKERS):
+    """
+    Yields product dicts from the JSON files in `raw_dir` (sorted by file name).
+    Files are read and parsed on a thread pool, with at most `2 * workers` files
+    in flight, so only a bounded number of parsed products exist at once.
+    """
+    count = 0
+    for product in iter_product_files(list_product_files(raw_dir), workers):
+        count += 1
+        yield product
+    logging.info(f"Streamed {count} products from {raw_dir}.")
+
+def iter_product_files(paths, workers=LOAD_WORKERS, source_key=None):
+    """
+    Yields the product dicts of the given JSON files, in order, loading them like
+    `iter_products`. With `source_key`, each product records its file path under that key.
+    """
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="json-loader") as pool:
+        pending = deque()
+        for path in paths:
+            pending.append((path, pool.submit(_load_file, path)))
+            if len(pending) < 2 * workers:
+                continue
+            path, future = pending.popleft()
+            product = future.result()
+            if product is not None:
+                if source_key:
+                    product[source_key] = path
+                yield product
+        while pending:
+            path, future = pending.popleft()
+            product = future.result()
+            if product is not None:
+                if source_key:
+                    product[source_key] = path
+                yield product
+
+def iter_batches(products, batch_size=BATCH_SIZE):
+    """
+    Splits products (a list, any iterable of dicts, or a DataFrame) into lists
+    of at most `batch_size` dicts.
+    """
+    if isinstance(products, pd.DataFrame):
+        for start in range(0, len(products), batch_size):
+            yield products.iloc[start:start + batch_size].to_dict("records")
+        return
+
+    batch = []
+    for product in products:
+        batch.append(product)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
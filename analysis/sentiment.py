@@ -0,0 +1,152 @@
+import os
+import sqlite3
+import hashlib
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+SENTIMENT_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "sentiment_cache.db")
+SENTIMENT_WORKERS = os.cpu_count() or 1
+SENTIMENT_CHUNK_SIZE = 256
+
+def textblob_polarity(texts):
+    """
+    TextBlob polarity in [-1, 1] per text (None where scoring fails).
+    """
+    from textblob import TextBlob
+
+    scores = []
+    for text in texts:
+        try:
+            scores.append(TextBlob(text).sentiment.polarity)
+        except Exception as e:
+            logging.warning(f"Sentiment analysis failed for review: {text[:30]}... - {e}")
+            scores.append(None)
+    return scores
+
+def vader_polarity(texts):
+    """
+    VADER compound score in [-1, 1] per text: a lexicon scorer, much faster than TextBlob.
+    """
+    try:
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    except ImportError as e:
+        raise ImportError("The vader scorer needs vaderSentiment: pip install vaderSentiment") from e
+
+    analyzer = SentimentIntensityAnalyzer()
+    scores = []
+    for text in texts:
+        try:
+            scores.append(analyzer.polarity_scores(text)["compound"])
+        except Exception as e:
+            logging.warning(f"Sentiment analysis failed for review: {text[:30]}... - {e}")
+            scores.append(None)
+    return scores
+
+# Scorer name -> function(list of texts) -> list of scores. Functions must be
+# module-level so they can run in worker processes.
+SCORERS = {
+    "textblob": textblob_polarity,
+    "vader": vader_polarity,
+}
+
+def sentiment_label(score):
+    return "Positive" if score > 0.1 else "Negative" if score < -0.1 else "Neutral"
+
+def text_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+class SentimentEngine:
+    """
+    Scores review texts with a pluggable scorer (see SCORERS).
+
+    Scores are cached in SQLite by (scorer, text hash), so a review that has
+    been scored once is never scored again, on this run or later ones. Texts
+    missing from the cache are scored in chunks of `chunk_size` on a process
+    pool of `processes` workers (in-process when there is only one chunk).
+    """
+
+    def __init__(self, scorer="textblob", cache_path=SENTIMENT_CACHE_PATH, processes=SENTIMENT_WORKERS,
+                 chunk_size=SENTIMENT_CHUNK_SIZE):
+        if scorer not in SCORERS:
+            raise ValueError(f"Unknown sentiment scorer {scorer!r}; choose from {sorted(SCORERS)}")
+        self.scorer = scorer
+        self.processes = max(1, processes)
+        self.chunk_size = chunk_size
+        self._executor = None
+        self._conn = None
+        if cache_path:
+            os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(cache_path)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sentiment (scorer TEXT, hash TEXT, score REAL, PRIMARY KEY (scorer, hash))"
+            )
+        self.hits = 0
+        self.scored = 0
+
+    def score(self, texts):
+        """
+        Returns one score per text, in order (None where the scorer failed).
+        """
+        hashes = [text_hash(text) for text in texts]
+        scores = self._cached(set(hashes))
+        self.hits += sum(h in scores for h in hashes)
+
+        missing = {}
+        for h, text in zip(hashes, texts):
+            if h not in scores:
+                missing.setdefault(h, text)
+        if missing:
+            fresh = dict(zip(missing, self._run(list(missing.values()))))
+            self._store(fresh)
+            scores.update(fresh)
+            self.scored += len(fresh)
+
+        return [scores[h] for h in hashes]
+
+    def close(self):
+        if self._executor:
+            self._executor.shutdown()
+            self._executor = None
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _run(self, texts):
+        scorer = SCORERS[self.scorer]
+        chunks = [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+        if self.processes == 1 or len(chunks) == 1:
+            return [score for chunk in chunks for score in scorer(chunk)]
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.processes)
+        return [score for scores in self._executor.map(scorer, chunks) for score in scores]
+
+    def _cached(self, hashes):
+        if not self._conn or not hashes:
+            return {}
+        found = {}
+        hashes = list(hashes)
+        for i in range(0, len(hashes), 500):
+            chunk = hashes[i:i + 500]
+            rows = self._conn.execute(
+                f"SELECT hash, score FROM sentiment WHERE scorer = ? AND hash IN ({','.join('?' * len(chunk))})",
+                [self.scorer, *chunk],
+            )
+            found.update(rows)
+        return found
+
+    def _store(self, scores):
+        # Failed scores are not cached, so they are retried next run.
+        if not self._conn:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sentiment (scorer, hash, score) VALUES (?, ?, ?)",
+                [(self.scorer, h, score) for h, score in scores.items() if score is not None],
+            )
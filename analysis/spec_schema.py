@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+# Summary column -> BestBuy spec label. To track another spec, add a line here.
+# Several columns may read the same label; each label is still looked up once.
+SPEC_COLUMNS = {
+    "ram": "System Memory (RAM)",
+    "storage": "Total Storage Capacity",
+    "cpu": "Processor Model",
+    "model_number": "Model Number",
+    "year": "Year of Release",
+    # Column names expected by the spec comparison sheet
+    "system_memory_ram": "System Memory (RAM)",
+    "total_storage_capacity": "Total Storage Capacity",
+    "processor_model": "Processor Model",
+    "cpu_boost_clock_frequency": "CPU Boost Clock Frequency",
+    "number_of_cpu_cores": "Number of CPU Cores",
+    "screen_size": "Screen Size",
+    "screen_resolution": "Screen Resolution",
+    "refresh_rate": "Refresh Rate",
+    "brightness": "Brightness",
+    "graphics": "Graphics",
+    "gpu_brand": "GPU Brand",
+    "battery_life_up_to": "Battery Life (up to)",
+    "product_weight": "Product Weight",
+    "year_of_release": "Year of Release",
+}
+
+def extract_spec_columns(full_specs, columns=SPEC_COLUMNS, index=None):
+    """
+    Reads every mapped spec out of a sequence of `full_specs` dicts in one pass.
+    Returns a DataFrame with one column per entry of `columns` (missing where a
+    product lacks the spec or has no specs dict).
+    """
+    labels = list(dict.fromkeys(columns.values()))
+    rows = [
+        [specs.get(label) for label in labels] if isinstance(specs, dict) else [None] * len(labels)
+        for specs in full_specs
+    ]
+    by_label = pd.DataFrame(rows, columns=labels, index=index).infer_objects()
+    spec_df = by_label[list(columns.values())]
+    spec_df.columns = list(columns)
+    return spec_df
+
+# Canonical units per kind of quantity: {unit word: factor to the canonical unit}.
+# A value without a unit is taken to be in the canonical unit already.
+UNITS = {
+    "memory": {  # gigabytes
+        "gigabytes": 1, "gigabyte": 1, "gb": 1, "megabytes": 1 / 1024, "megabyte": 1 / 1024, "mb": 1 / 1024,
+        "terabytes": 1024, "terabyte": 1024, "tb": 1024,
+    },
+    "storage": {  # gigabytes (drive makers' decimal units)
+        "gigabytes": 1, "gigabyte": 1, "gb": 1, "terabytes": 1000, "terabyte": 1000, "tb": 1000,
+        "megabytes": 1 / 1000, "megabyte": 1 / 1000, "mb": 1 / 1000,
+    },
+    "frequency": {  # gigahertz
+        "gigahertz": 1, "ghz": 1, "megahertz": 1 / 1000, "mhz": 1 / 1000,
+    },
+    "length": {  # inches
+        "inches": 1, "inch": 1, "in": 1, '"': 1, "centimeters": 1 / 2.54, "centimetres": 1 / 2.54, "cm": 1 / 2.54,
+    },
+    "brightness": {  # nits
+        "nits": 1, "nit": 1, "cd/m2": 1, "cd/m²": 1,
+    },
+    "duration": {  # hours
+        "hours": 1, "hour": 1, "hrs": 1, "hr": 1, "h": 1, "minutes": 1 / 60, "minute": 1 / 60, "min": 1 / 60,
+    },
+    "weight": {  # pounds
+        "pounds": 1, "pound": 1, "lbs": 1, "lb": 1, "ounces": 1 / 16, "ounce": 1 / 16, "oz": 1 / 16,
+        "kilograms": 2.20462, "kilogram": 2.20462, "kg": 2.20462, "grams": 0.00220462, "gram": 0.00220462, "g": 0.00220462,
+    },
+}
+
+# Spec column -> kind of quantity, for the columns compared numerically.
+SPEC_UNITS = {
+    "system_memory_ram": "memory",
+    "total_storage_capacity": "storage",
+    "cpu_boost_clock_frequency": "frequency",
+    "screen_size": "length",
+    "brightness": "brightness",
+    "battery_life_up_to": "duration",
+    "product_weight": "weight",
+}
+
+QUANTITY_PATTERN = r"(?P<value>\d[\d,]*(?:\.\d+)?|\.\d+)\s*(?P<unit>[a-zA-Z\"/²]+\d?)?"
+
+# Parsed values per kind, keyed by raw string; spec values repeat heavily across SKUs.
+_parsed = {kind: {} for kind in UNITS}
+
+def parse_quantities(values, kind):
+    """
+    Converts raw spec strings ("16 gigabytes", "Up to 10 hours", "3.52 pounds")
+    to floats in the canonical unit of `kind`. Returns a float Series aligned
+    with `values`; NaN where no number is found or the unit is not one of `kind`'s.
+    Each distinct string is parsed once, with a vectorised str.extract.
+    """
+    values = pd.Series(values)
+    memo = _parsed[kind]
+    new = [value for value in values.dropna().unique() if value not in memo]
+
+    if new:
+        parts = pd.Series(new).astype("string").str.extract(QUANTITY_PATTERN)
+        numbers = pd.to_numeric(parts["value"].str.replace(",", "", regex=False), errors="coerce")
+        units = parts["unit"].str.lower()
+        factors = units.map(UNITS[kind]).where(units.notna(), 1.0)
+        quantities = (numbers * pd.to_numeric(factors, errors="coerce")).to_numpy(dtype="float64", na_value=np.nan)
+        memo.update(zip(new, quantities))
+
+    return values.map(memo).astype("float64")
+
+def typed_spec_columns(df, units=SPEC_UNITS):
+    """
+    Numeric versions of the spec columns in `units` that `df` has, in canonical units.
+    """
+    return pd.DataFrame(
+        {col: parse_quantities(df[col], kind).to_numpy() for col, kind in units.items() if col in df.columns},
+        index=df.index,
+    )
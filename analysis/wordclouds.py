@@ -0,0 +1,153 @@
+import os
+import json
+import logging
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from wordcloud import WordCloud, STOPWORDS
+
+from analysis_cache import SOURCE_COLUMN
+from sentiment import text_hash
+
+TERM_COUNTS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "wordcloud_counts.json")
+LABELS = ("Positive", "Neutral", "Negative")
+# Cloud name -> (sentiment labels it covers, colormap)
+CLOUDS = {
+    "All": (LABELS, "cool"),
+    "Positive": (("Positive",), "Greens"),
+    "Negative": (("Negative",), "Reds"),
+}
+MAX_WORDS = 200
+TOKEN_PATTERN = r"[a-z][a-z']+"
+
+class TermCounts:
+    """
+    Term frequencies of the reviews in the current run, per sentiment label,
+    with the per-product counts persisted as JSON for the next run.
+
+    Reviews are grouped by product (their source file when known, otherwise the
+    product name). A group whose reviews and labels are exactly the ones saved
+    last time reuses its saved counts; any other group is tokenised again
+    (lower-cased words minus stop-words, every review occurrence counted). The
+    clouds sum only the groups seen in this run, so deleted or unselected
+    products drop out, and brand names are removed when the clouds are built.
+    """
+
+    def __init__(self, path=TERM_COUNTS_PATH, stopwords=STOPWORDS):
+        self.path = path
+        self.stopwords = {word.lower() for word in stopwords}
+        self.groups = {}
+        self.brands = set()
+        self.tokenised = 0
+        self.reused = 0
+        self._saved = self._load()
+
+    def update(self, reviews_df):
+        """
+        Counts a scored batch (`review`, `sentiment_label`, `brand` and
+        `product` or SOURCE_COLUMN columns).
+        """
+        if reviews_df.empty:
+            return
+        group_column = SOURCE_COLUMN if SOURCE_COLUMN in reviews_df.columns else "product"
+        df = pd.DataFrame({
+            "group": reviews_df[group_column].astype(str).to_numpy(),
+            "label": reviews_df["sentiment_label"].to_numpy(),
+            "review": reviews_df["review"].to_numpy(),
+        })
+        self.brands.update(str(brand).lower() for brand in reviews_df["brand"].dropna().unique())
+
+        # A product split across batches (or two products sharing a name) gets distinct keys
+        keys = {}
+        for group in df["group"].unique():
+            key, n = group, 1
+            while key in self.groups:
+                n += 1
+                key = f"{group}#{n}"
+            keys[group] = key
+        df["group"] = df["group"].map(keys)
+
+        signature = df["label"] + ":" + df["review"].map(text_hash)
+        digests = signature.groupby(df["group"], sort=False).agg(lambda sigs: text_hash("|".join(sigs)))
+
+        stale = []
+        for key, digest in digests.items():
+            saved = self._saved.get(key)
+            if saved and saved.get("digest") == digest:
+                self.groups[key] = saved
+            else:
+                self.groups[key] = {"digest": digest, "counts": {}}
+                stale.append(key)
+        self.reused += int((~df["group"].isin(stale)).sum())
+
+        fresh = df[df["group"].isin(stale)]
+        if fresh.empty:
+            return
+        tokens = fresh["review"].str.lower().str.findall(TOKEN_PATTERN)
+        terms = pd.DataFrame({
+            "group": fresh["group"].to_numpy(), "label": fresh["label"].to_numpy(), "term": tokens.to_numpy()
+        }).explode("term")
+        terms = terms[terms["term"].notna() & ~terms["term"].isin(self.stopwords)]
+        for (key, label, term), count in terms.groupby(["group", "label", "term"]).size().items():
+            counts = self.groups[key]["counts"].setdefault(label, {})
+            counts[term] = int(count)
+        self.tokenised += len(fresh)
+
+    def frequencies(self, labels):
+        total = Counter()
+        for group in self.groups.values():
+            for label in labels:
+                total.update(group["counts"].get(label, {}))
+        for brand in self.brands:
+            total.pop(brand, None)
+        return total
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"groups": self.groups}, f)
+        os.replace(tmp_path, self.path)
+        logging.info(
+            f"✅ Word counts saved to {self.path} ({len(self.groups)} products; "
+            f"{self.tokenised} reviews tokenised, {self.reused} reused)."
+        )
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f).get("groups", {})
+        except Exception as e:
+            logging.warning(f"⚠️ Could not read word counts {self.path}; recounting: {e}")
+            return {}
+
+def _render_cloud(frequencies, colormap, path):
+    WordCloud(width=800, height=400, background_color="white", colormap=colormap).generate_from_frequencies(frequencies).to_file(path)
+    return path
+
+def render_word_clouds(term_counts, out_dir="reports", processes=None):
+    """
+    Renders the CLOUDS straight to PNG files in parallel. Returns the paths written.
+    """
+    jobs = []
+    for name, (labels, colormap) in CLOUDS.items():
+        frequencies = dict(term_counts.frequencies(labels).most_common(MAX_WORDS))
+        if frequencies:
+            jobs.append((name, frequencies, colormap, os.path.join(out_dir, f"{name.lower()}_wordcloud.png")))
+    if not jobs:
+        return []
+
+    written = []
+    with ProcessPoolExecutor(max_workers=processes or min(len(jobs), os.cpu_count() or 1)) as executor:
+        futures = {executor.submit(_render_cloud, frequencies, colormap, path): name for name, frequencies, colormap, path in jobs}
+        for future, name in futures.items():
+            try:
+                path = future.result()
+                logging.info(f"✅ Saved word cloud: {path}")
+                print(f"✅ Saved word cloud: {path}")
+                written.append(path)
+            except Exception as e:
+                logging.error(f"❌ Failed to generate word cloud for {name} reviews: {e}")
+    return written
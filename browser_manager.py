@@ -1,10 +1,29 @@
 import os
+import json
+import time
+import queue
 import logging
+import threading
 from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
-from config import PAGE_LOAD_TIMEOUT, USER_AGENT
+from config import (
+    PAGE_LOAD_TIMEOUT,
+    USER_AGENT,
+    POOL_SIZE,
+    POOL_CHECKOUT_TIMEOUT,
+    BROWSER_PROFILE,
+    LEAN_BLOCKED_URL_PATTERNS,
+    LEAN_ALLOWED_URL_PATTERNS,
+    WARM_START,
+    CHROME_PROFILE_DIR,
+    DRIVER_PATH_CACHE,
+    WARM_STATE_MAX_AGE,
+)
+
+WARM_STATE_FILE = "scraper_state.json"
 
 # Ensure logs directory exists
 os.makedirs('logs', exist_ok=True)
@@ -18,28 +37,161 @@ logging.basicConfig(
 class BrowserManager:
     _driver = None
 
+    _profile = BROWSER_PROFILE
+    _warm_start = WARM_START
+
+    @classmethod
+    def set_profile(cls, profile):
+        """
+        Selects the profile ("default" or "lean") used for sessions launched from now on.
+        """
+        if profile not in ("default", "lean"):
+            raise ValueError(f"Unknown browser profile: {profile}")
+        cls._profile = profile
+
+    @classmethod
+    def set_warm_start(cls, enabled):
+        """
+        Enables reuse of the cached driver path and persistent Chrome profiles.
+        """
+        cls._warm_start = bool(enabled)
+
+    @classmethod
+    def create_driver(cls, profile=None, session_name="main"):
+        """
+        Launches a new, independent Chrome WebDriver session.
+
+        The "lean" profile runs headless with the `eager` page-load strategy,
+        images disabled and ads/analytics/media URLs blocked through CDP, since
+        the scrapers only read text from the DOM.
+
+        With warm start enabled, the session uses the persistent user-data dir
+        `CHROME_PROFILE_DIR/<session_name>`; concurrent sessions need distinct names
+        because Chrome locks its profile directory.
+        """
+        profile = profile or cls._profile
+        user_data_dir = None
+        try:
+            options = Options()
+            # Uncomment below line to see browser window
+            # options.add_argument("--headless=new")  # ✅ Faster and doesn't open the UI
+            options.add_argument('--disable-gpu')
+            options.add_argument('--no-sandbox')
+            options.add_argument("--window-size=1920,1080")
+
+            if USER_AGENT:
+                options.add_argument(f"user-agent={USER_AGENT}")
+
+            if profile == "lean":
+                cls._apply_lean_options(options)
+
+            if cls._warm_start:
+                user_data_dir = os.path.abspath(os.path.join(CHROME_PROFILE_DIR, session_name))
+                os.makedirs(user_data_dir, exist_ok=True)
+                options.add_argument(f"--user-data-dir={user_data_dir}")
+
+            driver = cls._launch_chrome(options)
+            driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+            driver.scraper_user_data_dir = user_data_dir
+
+            if profile == "lean":
+                cls._block_urls(driver)
+
+            logging.info(f"Chrome WebDriver launched with webdriver-manager ({profile} profile).")
+            return driver
+        except Exception as e:
+            logging.error(f"Error initializing WebDriver: {e}")
+            raise
+
+    @classmethod
+    def _launch_chrome(cls, options):
+        # ✅ Use webdriver-manager here (skipped when a cached driver path is still valid)
+        cached_path = cls._cached_driver_path() if cls._warm_start else None
+        if cached_path:
+            try:
+                return webdriver.Chrome(service=Service(cached_path), options=options)
+            except SessionNotCreatedException as e:
+                # Usually a Chrome update made the cached driver incompatible.
+                logging.warning(f"⚠️ Cached chromedriver rejected, re-resolving: {e}")
+
+        driver_path = ChromeDriverManager().install()
+        if cls._warm_start:
+            os.makedirs(os.path.dirname(DRIVER_PATH_CACHE), exist_ok=True)
+            with open(DRIVER_PATH_CACHE, "w", encoding="utf-8") as f:
+                f.write(driver_path)
+        return webdriver.Chrome(service=Service(driver_path), options=options)
+
+    @staticmethod
+    def _cached_driver_path():
+        try:
+            with open(DRIVER_PATH_CACHE, "r", encoding="utf-8") as f:
+                path = f.read().strip()
+        except OSError:
+            return None
+        return path if path and os.access(path, os.X_OK) else None
+
+    @staticmethod
+    def has_warm_state(driver):
+        """
+        True if the driver runs on a persistent profile whose country selection
+        was recorded less than WARM_STATE_MAX_AGE seconds ago.
+        """
+        user_data_dir = getattr(driver, "scraper_user_data_dir", None)
+        if not user_data_dir:
+            return False
+        try:
+            with open(os.path.join(user_data_dir, WARM_STATE_FILE), "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return time.time() - state.get("country_selected_at", 0) < WARM_STATE_MAX_AGE
+
+    @staticmethod
+    def mark_warm_state(driver):
+        """
+        Records that the driver's persistent profile has the country selection cookies.
+        """
+        user_data_dir = getattr(driver, "scraper_user_data_dir", None)
+        if not user_data_dir:
+            return
+        with open(os.path.join(user_data_dir, WARM_STATE_FILE), "w", encoding="utf-8") as f:
+            json.dump({"country_selected_at": time.time()}, f)
+
+    @staticmethod
+    def clear_warm_state(driver):
+        user_data_dir = getattr(driver, "scraper_user_data_dir", None)
+        if user_data_dir:
+            try:
+                os.remove(os.path.join(user_data_dir, WARM_STATE_FILE))
+            except OSError:
+                pass
+
+    @staticmethod
+    def _apply_lean_options(options):
+        options.add_argument("--headless=new")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.page_load_strategy = "eager"
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+        })
+
+    @staticmethod
+    def _block_urls(driver):
+        allowed = set(LEAN_ALLOWED_URL_PATTERNS)
+        patterns = [pattern for pattern in LEAN_BLOCKED_URL_PATTERNS if pattern not in allowed]
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+            logging.info(f"Blocking {len(patterns)} URL patterns via CDP.")
+        except Exception as e:
+            logging.warning(f"⚠️ Could not set blocked URLs via CDP: {e}")
+
     @classmethod
     def get_driver(cls):
         if cls._driver is None:
-            try:
-                options = Options()
-                # Uncomment below line to see browser window
-                # options.add_argument("--headless=new")  # ✅ Faster and doesn't open the UI
-                options.add_argument('--disable-gpu')
-                options.add_argument('--no-sandbox')
-                options.add_argument("--window-size=1920,1080")
-
-                if USER_AGENT:
-                    options.add_argument(f"user-agent={USER_AGENT}")
-
-                # ✅ Use webdriver-manager here
-                service = Service(ChromeDriverManager().install())
-                cls._driver = webdriver.Chrome(service=service, options=options)
-                cls._driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
-                logging.info("Chrome WebDriver launched with webdriver-manager.")
-            except Exception as e:
-                logging.error(f"Error initializing WebDriver: {e}")
-                raise
+            cls._driver = cls.create_driver()
         return cls._driver
 
     @classmethod
@@ -48,3 +200,168 @@ class BrowserManager:
             cls._driver.quit()
             logging.info("WebDriver session closed.")
             cls._driver = None
+
+    @staticmethod
+    def is_healthy(driver):
+        """
+        Returns True if the session still answers a trivial script round trip.
+        """
+        try:
+            driver.execute_script("return 1;")
+            return True
+        except Exception:
+            return False
+
+
+class BrowserPool:
+    """
+    Bounded pool of independent Chrome sessions for parallel scraping.
+
+    Sessions are launched lazily up to `size`. Callers check a driver out with
+    `acquire()` (or the `session()` context manager) and hand it back with
+    `release()`. Sessions that fail a health check on checkout or return are
+    quit and replaced. `acquire(priority=True)` callers are served before
+    ordinary ones: while one is waiting, a freed session is not handed to an
+    ordinary caller.
+    """
+
+    def __init__(self, size=POOL_SIZE, checkout_timeout=POOL_CHECKOUT_TIMEOUT, profile=None):
+        self.size = max(1, int(size))
+        self.checkout_timeout = checkout_timeout
+        self.profile = profile
+        self._idle = queue.LifoQueue()
+        self._all = set()
+        self._lock = threading.Lock()
+        self._slots = threading.Condition()
+        self._in_use = 0
+        self._priority_waiting = 0
+        self._closed = False
+        # Profile directories are handed out per live session so warm-start
+        # sessions never share (and lock) the same user-data dir.
+        self._free_names = queue.Queue()
+        for idx in range(self.size):
+            self._free_names.put(f"worker-{idx}")
+        self._names = {}
+
+    def acquire(self, priority=False):
+        """
+        Checks out a healthy driver, launching one if the pool is not yet full.
+        Blocks up to `checkout_timeout` seconds when all sessions are busy (or,
+        without `priority`, while a priority caller is waiting).
+        """
+        if self._closed:
+            raise RuntimeError("BrowserPool is closed.")
+
+        deadline = time.monotonic() + self.checkout_timeout
+        with self._slots:
+            if priority:
+                self._priority_waiting += 1
+            try:
+                while self._in_use >= self.size or (self._priority_waiting and not priority):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"No browser session free within {self.checkout_timeout} seconds.")
+                    self._slots.wait(remaining)
+                self._in_use += 1
+            finally:
+                if priority:
+                    self._priority_waiting -= 1
+                    self._slots.notify_all()
+
+        try:
+            while True:
+                try:
+                    driver = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._launch()
+
+                if BrowserManager.is_healthy(driver):
+                    return driver
+
+                logging.warning("⚠️ Discarding unhealthy browser session on checkout.")
+                self._discard(driver)
+        except Exception:
+            self._free_slot()
+            raise
+
+    def release(self, driver, healthy=None):
+        """
+        Returns a driver to the pool. Pass `healthy=False` to force replacement.
+        """
+        if healthy is None:
+            healthy = BrowserManager.is_healthy(driver)
+
+        if self._closed or not healthy:
+            if not healthy:
+                logging.warning("⚠️ Discarding unhealthy browser session on return.")
+            self._discard(driver)
+        else:
+            self._idle.put(driver)
+        self._free_slot()
+
+    def session(self):
+        """
+        Context manager wrapping acquire()/release().
+        """
+        return _PooledSession(self)
+
+    def close(self):
+        """
+        Quits every session owned by the pool.
+        """
+        self._closed = True
+        with self._lock:
+            drivers = list(self._all)
+        for driver in drivers:
+            self._discard(driver)
+        logging.info("Browser pool closed.")
+
+    def _free_slot(self):
+        with self._slots:
+            self._in_use -= 1
+            self._slots.notify_all()
+
+    def _launch(self):
+        name = self._free_names.get_nowait()
+        try:
+            driver = BrowserManager.create_driver(self.profile, session_name=name)
+        except Exception:
+            self._free_names.put(name)
+            raise
+        with self._lock:
+            self._all.add(driver)
+            self._names[driver] = name
+            count = len(self._all)
+        logging.info(f"Browser pool launched session {count}/{self.size}.")
+        return driver
+
+    def _discard(self, driver):
+        with self._lock:
+            self._all.discard(driver)
+            name = self._names.pop(driver, None)
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.warning(f"Error quitting browser session: {e}")
+        if name:
+            self._free_names.put(name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class _PooledSession:
+    def __init__(self, pool):
+        self.pool = pool
+        self.driver = None
+
+    def __enter__(self):
+        self.driver = self.pool.acquire()
+        return self.driver
+
+    def __exit__(self, exc_type, exc, tb):
+        self.pool.release(self.driver)
+        self.driver = None
@@ -11,3 +11,94 @@ WAIT_MIN = float(os.getenv("WAIT_MIN", 2))
 WAIT_MAX = float(os.getenv("WAIT_MAX", 5))
 PAGE_LOAD_TIMEOUT = 30
 IMPLICIT_WAIT = 10
+
+# Politeness budget per host: requests per second and burst size. Defaults to the
+# average pace of the old WAIT_MIN..WAIT_MAX random delay.
+REQUEST_RATE = float(os.getenv("REQUEST_RATE", 2 / (WAIT_MIN + WAIT_MAX)))
+REQUEST_BURST = int(os.getenv("REQUEST_BURST", 1))
+
+# Per-product wall-clock budget (seconds) shared by all waits on a detail page
+PRODUCT_TIME_BUDGET = float(os.getenv("PRODUCT_TIME_BUDGET", 600))
+
+# Browser pool (parallel listing and detail scraping). A checkout may have to
+# wait for a detail page to finish, so the timeout is at least PRODUCT_TIME_BUDGET
+POOL_SIZE = int(os.getenv("POOL_SIZE", os.cpu_count() or 1))
+POOL_CHECKOUT_TIMEOUT = max(float(os.getenv("POOL_CHECKOUT_TIMEOUT", 2 * PRODUCT_TIME_BUDGET)), PRODUCT_TIME_BUDGET)
+
+# Persistent detail-page frontier (listing produces, detail workers consume);
+# a lease that outlives FRONTIER_LEASE seconds is handed to another worker
+FRONTIER_PATH = os.getenv("FRONTIER_PATH", os.path.join("data", "frontier.db"))
+FRONTIER_LEASE = float(os.getenv("FRONTIER_LEASE", 2 * PRODUCT_TIME_BUDGET))
+FRONTIER_MAX_ATTEMPTS = int(os.getenv("FRONTIER_MAX_ATTEMPTS", 3))
+FRONTIER_POLL_INTERVAL = float(os.getenv("FRONTIER_POLL_INTERVAL", 0.5))
+
+# Upper bound on listing result pages fetched (cp=1..N, fanned out over the pool)
+MAX_LISTING_PAGES = int(os.getenv("MAX_LISTING_PAGES", 50))
+
+# Browser profile: "default" (headed, full page loads) or "lean" (headless,
+# eager page loads, no images, ads/analytics/media blocked via CDP)
+BROWSER_PROFILE = os.getenv("BROWSER_PROFILE", "default")
+
+def _csv_list(value):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+# URL patterns (CDP wildcards) blocked in the lean profile
+LEAN_BLOCKED_URL_PATTERNS = _csv_list(os.getenv("LEAN_BLOCKED_URL_PATTERNS", ",".join([
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3",
+    "*doubleclick.net*", "*googlesyndication.com*", "*googleadservices.com*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*facebook.net*",
+    "*adobedtm.com*", "*demdex.net*", "*omtrdc.net*", "*quantummetric.com*",
+    "*criteo.com*", "*bing.com/bat*", "*pinimg.com*", "*tiktok.com*",
+])))
+
+# Patterns that must never be blocked; entries here are removed from the block list
+LEAN_ALLOWED_URL_PATTERNS = _csv_list(os.getenv("LEAN_ALLOWED_URL_PATTERNS", ""))
+
+# Warm start: reuse a cached chromedriver path and persistent Chrome profiles
+# (cookies + country selection) so the homepage/splash hop can be skipped
+WARM_START = os.getenv("WARM_START", "false").lower() in ("1", "true", "yes")
+CACHE_DIR = os.getenv("CACHE_DIR", "cache")
+CHROME_PROFILE_DIR = os.path.join(CACHE_DIR, "chrome-profiles")
+DRIVER_PATH_CACHE = os.path.join(CACHE_DIR, "chromedriver_path.txt")
+WARM_STATE_MAX_AGE = float(os.getenv("WARM_STATE_MAX_AGE", 7 * 24 * 3600))
+
+# Run manifest (resumable, incremental crawls)
+MANIFEST_PATH = os.getenv("MANIFEST_PATH", os.path.join("data", "manifest.json"))
+DETAIL_MAX_AGE = float(os.getenv("DETAIL_MAX_AGE_HOURS", 7 * 24)) * 3600
+# Per-product progress is written to disk every MANIFEST_SAVE_EVERY updates or
+# MANIFEST_SAVE_INTERVAL seconds (and always at run milestones and on exit)
+MANIFEST_SAVE_EVERY = int(os.getenv("MANIFEST_SAVE_EVERY", 25))
+MANIFEST_SAVE_INTERVAL = float(os.getenv("MANIFEST_SAVE_INTERVAL", 10))
+
+# Product storage: "json" (one file per product in data/raw) or "sqlite"
+# (SKU-keyed store at PRODUCT_DB_PATH; export to data/raw with --export-json)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "json")
+PRODUCT_DB_PATH = os.getenv("PRODUCT_DB_PATH", os.path.join("data", "products.db"))
+
+# Write product JSON from a background thread (atomic, coalesced); flushed on exit
+WRITE_BEHIND = os.getenv("WRITE_BEHIND", "true").lower() in ("1", "true", "yes")
+
+# Re-crawl reviews newest-first and stop at the first page with no new reviews
+INCREMENTAL_REVIEWS = os.getenv("INCREMENTAL_REVIEWS", "true").lower() in ("1", "true", "yes")
+
+# Append-only price/rating/review-count observations, one batch per listing crawl.
+# Resolved against the project root, since the analysis reads it from another directory.
+HISTORY_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    os.getenv("HISTORY_PATH", os.path.join("data", "history", "observations.bin")),
+)
+
+# Compressed, content-addressed HTML snapshots of listing/detail/review pages,
+# re-parsed offline with `python main.py --replay`
+SNAPSHOTS = os.getenv("SNAPSHOTS", "false").lower() in ("1", "true", "yes")
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", os.path.join("data", "snapshots"))
+
+# Category registry: name -> category id, search term and facet filters (JSON).
+# CATEGORIES limits a crawl to some of them (comma-separated names; default: all enabled)
+CATEGORIES_PATH = os.getenv("CATEGORIES_PATH", "categories.json")
+CATEGORIES = _csv_list(os.getenv("CATEGORIES", ""))
+# Categories last listed within the same CATEGORY_STALENESS_BUCKET_HOURS count as
+# equally stale and are ordered by size; keep it below the crawl interval
+CATEGORY_STALENESS_BUCKET = float(os.getenv("CATEGORY_STALENESS_BUCKET_HOURS", 1)) * 3600
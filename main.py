@@ -1,38 +1,303 @@
+import time
+import argparse
 import logging
-import os
-from browser_manager import BrowserManager
-from scraper.category_scraper import LaptopCategoryScraper
+import threading
+from browser_manager import BrowserManager, BrowserPool
+from config import (
+    MANIFEST_PATH, DETAIL_MAX_AGE, STORAGE_BACKEND, PRODUCT_DB_PATH, WRITE_BEHIND, HISTORY_PATH,
+    SNAPSHOTS, SNAPSHOT_DIR, CATEGORIES, FRONTIER_PATH, FRONTIER_LEASE, FRONTIER_MAX_ATTEMPTS,
+    FRONTIER_POLL_INTERVAL,
+)
+from replay import SnapshotReplayer
+from scheduler import CategoryScheduler
 from scraper.product_scraper import ProductDetailScraper
+from utils.category_registry import load_categories
+from utils.frontier import Frontier
+from utils.history_store import PriceHistory
+from utils.json_utils import enable_write_behind, disable_write_behind, load_product_json, update_product_json
+from utils.manifest_utils import RunManifest
+from utils.product_store import ProductStore
+from utils.snapshot_store import SnapshotStore
 
-def main():
+def scrape_into_store(scraper, store, key):
+    """
+    Store-backed counterpart of `ProductDetailScraper.scrape_product_page`.
+    """
+    product = store.get_product(key)
+    url = product.get("product_url") if product else None
+    if not url:
+        logging.warning(f"No URL stored for {key}. Skipping.")
+        return None
+
+    details = scraper.scrape_product(url, known_reviews=product.get("all_reviews"))
+    store.save_details(key, details["full_specs"], details["all_reviews"])
+    logging.info(f"✅ Stored full specs & reviews for {key}.")
+    return details
+
+def scrape_detail(scraper, manifest, key, path, store=None):
+    """
+    Scrapes one product's detail page and records the outcome per stage in the manifest.
+    A failure is logged and recorded instead of aborting the crawl.
+    """
+    try:
+        if path is None:
+            details = scrape_into_store(scraper, store, key)
+        else:
+            details = scraper.scrape_product_page(path)
+    except Exception as e:
+        logging.error(f"❌ Detail scraping failed for {path or key}: {e}")
+        for stage in ("specs", "reviews"):
+            manifest.mark_stage(key, stage, "failed", error=e)
+        manifest.save()
+        return False
+
+    record_details(manifest, key, details)
+    manifest.save()
+    return details is not None
+
+def record_details(manifest, key, details):
+    if details is None:
+        for stage in ("specs", "reviews"):
+            manifest.mark_stage(key, stage, "failed", error="No product URL")
+    else:
+        manifest.mark_stage(key, "specs", "done" if details["full_specs"] != "N/A" else "empty")
+        manifest.mark_stage(key, "reviews", "done" if details["all_reviews"] else "empty")
+
+def run_detail_workers(frontier, manifest, listing_done, workers=1, pool=None, driver=None, store=None, snapshots=None):
+    """
+    Consumes the frontier until `listing_done` is set and nothing is queued or
+    leased. With a pool, `workers` threads each check out a session per product;
+    otherwise one worker uses `driver`. Returns the number of products updated.
+    """
+    def consume(name):
+        updated = 0
+        while True:
+            item = frontier.lease(name)
+            if item is None:
+                if listing_done.is_set() and not frontier.active():
+                    return updated
+                time.sleep(FRONTIER_POLL_INTERVAL)
+                continue
+
+            key, _, path = item
+            try:
+                if pool is not None:
+                    with pool.session() as session:
+                        ok = scrape_detail(ProductDetailScraper(session, snapshots=snapshots), manifest, key, path, store)
+                else:
+                    ok = scrape_detail(ProductDetailScraper(driver, snapshots=snapshots), manifest, key, path, store)
+            except Exception as e:
+                logging.error(f"❌ Detail worker {name} failed on {path or key}: {e}")
+                ok = False
+
+            if ok:
+                frontier.complete(key)
+                updated += 1
+            else:
+                frontier.fail(key, "detail scraping failed")
+
+    if pool is None:
+        return consume("main")
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda n=f"detail-{i}": results.append(consume(n)), name=f"detail-{i}")
+        for i in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(results)
+
+def enqueue_pending_details(frontier, manifest, max_age):
+    """
+    Makes sure every product of the current run that still needs a detail visit is in the frontier.
+    """
+    for key, path in manifest.detail_queue(max_age):
+        frontier.push(key, None, path)
+
+def replay_snapshots(snapshots, manifest, store=None):
+    """
+    Rebuilds listings and details from saved HTML snapshots with the current
+    parsers, without a browser. Products without a detail snapshot keep their data.
+    """
+    replayer = SnapshotReplayer(snapshots)
+    products = replayer.replay_listing(manifest=manifest, store=store)
+    manifest.finish_listing()
+    logging.info(f"🔁 Replayed {len(products)} listings.")
+
+    jobs = []
+    for key, path in manifest.detail_queue(0):
+        product = store.get_product(key) if path is None else load_product_json(path)
+        url = product.get("product_url") if product else None
+        if url:
+            jobs.append(((key, path), url, product.get("all_reviews")))
+
+    updated = 0
+    for (key, path), details in replayer.replay_details(jobs):
+        if details is None:
+            logging.info(f"ℹ️ No detail snapshot for {path or key}; keeping stored details.")
+            continue
+        if path is None:
+            store.save_details(key, details["full_specs"], details["all_reviews"])
+        else:
+            update_product_json(path, details)
+        record_details(manifest, key, details)
+        updated += 1
+
+    logging.info(f"✅ Replay finished: {updated}/{len(jobs)} products re-parsed from snapshots.")
+    manifest.finish_run()
+
+def main(workers=1, lean=False, warm=False, resume=False, full=False, storage=STORAGE_BACKEND, export_json=False,
+         snapshots=SNAPSHOTS, replay=False, categories=CATEGORIES):
     driver = None
+    pool = None
+    frontier = None
+    store = ProductStore(PRODUCT_DB_PATH) if storage == "sqlite" else None
+    snapshot_store = SnapshotStore(SNAPSHOT_DIR) if snapshots or replay else None
+    manifest = RunManifest(MANIFEST_PATH)
     try:
-        driver = BrowserManager.get_driver()
-
-        # ✅ STEP 1: Scrape product listings
-        logging.info("🚀 Starting product card scraping...")
-        category_scraper = LaptopCategoryScraper(driver)
-        category_scraper.navigate_to_laptops()
-        category_scraper.extract_product_cards()
-
-        products = category_scraper.get_products()
-        logging.info(f"✅ {len(products)} products saved to JSON files.")
-
-        # ✅ STEP 2: Scrape product detail pages (specs + reviews)
-        logging.info("🔍 Starting product detail scraping...")
-        detail_scraper = ProductDetailScraper(driver)
-        json_dir = "./data/raw/"
-        for filename in os.listdir(json_dir):
-            if filename.endswith(".json"):
-                path = os.path.join(json_dir, filename)
-                detail_scraper.scrape_product_page(path)
+        if lean:
+            BrowserManager.set_profile("lean")
+        if warm:
+            BrowserManager.set_warm_start(True)
+        if WRITE_BEHIND:
+            enable_write_behind()
+
+        if replay:
+            # ✅ Offline: re-parse saved HTML instead of crawling
+            manifest.start_run()
+            replay_snapshots(snapshot_store, manifest, store)
+            if store and export_json:
+                store.export_json("./data/raw/")
+            return
+
+        detail_max_age = 0 if full else DETAIL_MAX_AGE
+        frontier = Frontier(FRONTIER_PATH, lease_seconds=FRONTIER_LEASE, max_attempts=FRONTIER_MAX_ATTEMPTS)
+        frontier.requeue_leased()
+        listing_done = threading.Event()
+
+        if workers > 1:
+            # Listing pages and detail pages of all categories share one pool of sessions.
+            logging.info(f"🧵 Worker mode: {workers} browser sessions.")
+            pool = BrowserPool(size=workers)
+        else:
+            driver = BrowserManager.get_driver()
+
+        def run_listing():
+            try:
+                # ✅ STEP 1: Scrape product listings; each listed product that needs a
+                # detail visit goes straight into the frontier
+                logging.info("🚀 Starting product card scraping...")
+                scheduler = CategoryScheduler(
+                    load_categories(names=categories), manifest,
+                    pool=pool, driver=driver, store=store, snapshots=snapshot_store,
+                    frontier=frontier, detail_max_age=detail_max_age
+                )
+                products = scheduler.run()
+                manifest.finish_listing()
+
+                logging.info(f"✅ {len(products)} products saved to JSON files.")
+                PriceHistory(HISTORY_PATH).append(products)
+            except Exception as e:
+                logging.error(f"❌ Listing stage failed: {e}")
+            finally:
+                enqueue_pending_details(frontier, manifest, detail_max_age)
+                listing_done.set()
+
+        # ✅ STEP 2: Scrape product detail pages (specs + reviews) that are new, changed or
+        # stale. With a pool this runs while the listing is still producing products.
+        listing_thread = None
+        if resume and manifest.can_resume():
+            logging.info(f"⏯️ Resuming run {manifest.run['id']}; skipping listing stage.")
+            enqueue_pending_details(frontier, manifest, detail_max_age)
+            listing_done.set()
+        else:
+            manifest.start_run()
+            if pool is not None:
+                listing_thread = threading.Thread(target=run_listing, name="listing")
+                listing_thread.start()
+            else:
+                run_listing()
+
+        logging.info(f"🔍 Starting product detail scraping ({frontier.active()} products queued so far).")
+        updated = run_detail_workers(
+            frontier, manifest, listing_done, workers=workers, pool=pool, driver=driver,
+            store=store, snapshots=snapshot_store
+        )
+        if listing_thread:
+            listing_thread.join()
+
+        logging.info(f"✅ Detail scraping finished: {updated} products updated; frontier {frontier.counts()}.")
+        manifest.finish_run()
+
+        if store and export_json:
+            store.export_json("./data/raw/")
 
     except Exception as e:
         logging.error(f"❌ Exception in main(): {e}")
 
     finally:
+        # Saving flushes queued product writes before the manifest records them as done.
+        manifest.save(force=True)
+        disable_write_behind()
+        if pool:
+            pool.close()
         if driver:
             BrowserManager.quit_driver()
+        if frontier:
+            frontier.close()
+        if store:
+            store.close()
+        if snapshot_store:
+            snapshot_store.close()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Scrape BestBuy laptop listings and product details.")
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Number of concurrent browser sessions for detail scraping (default: 1)."
+    )
+    parser.add_argument(
+        "--lean", action="store_true",
+        help="Headless, eager-load Chrome with images, media, ads and analytics blocked."
+    )
+    parser.add_argument(
+        "--warm", action="store_true",
+        help="Reuse the cached chromedriver and persistent Chrome profiles (see WARM_START)."
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="Continue the last unfinished run from the manifest instead of re-listing."
+    )
+    parser.add_argument(
+        "--full", action="store_true",
+        help="Re-visit every listed product, ignoring detail freshness in the manifest."
+    )
+    parser.add_argument(
+        "--storage", choices=("json", "sqlite"), default=STORAGE_BACKEND,
+        help="Where scraped products are written (default from STORAGE_BACKEND)."
+    )
+    parser.add_argument(
+        "--export-json", action="store_true",
+        help="With --storage sqlite, export the store to data/raw/*.json after the crawl."
+    )
+    parser.add_argument(
+        "--snapshots", action="store_true", default=SNAPSHOTS,
+        help="Save compressed HTML snapshots of listing, detail and review pages (see SNAPSHOT_DIR)."
+    )
+    parser.add_argument(
+        "--replay", action="store_true",
+        help="Re-parse the saved snapshots with the current extractors instead of crawling (no browser)."
+    )
+    parser.add_argument(
+        "--category", action="append", default=None,
+        help="Registry category to list (repeatable; default: CATEGORIES, else every enabled one)."
+    )
+    args = parser.parse_args()
+    main(
+        workers=args.workers, lean=args.lean, warm=args.warm, resume=args.resume, full=args.full,
+        storage=args.storage, export_json=args.export_json, snapshots=args.snapshots, replay=args.replay,
+        categories=args.category or CATEGORIES
+    )
@@ -0,0 +1,79 @@
+# orchestrator.py
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+class CrawlOrchestrator:
+    """
+    Runs blocking scraper jobs concurrently on a BrowserPool from an asyncio event loop.
+
+    Each job is `job(driver, item)` and runs on a worker thread with a pooled
+    session checked out for it (ahead of ordinary checkouts with `priority`). Politeness is not enforced here but by the shared
+    per-host token bucket (`utils.delay_utils.throttle`) the scrapers call before
+    every navigation, so a session waiting for a request slot never holds up
+    sessions that are parsing or waiting on the page.
+    """
+
+    def __init__(self, pool, priority=False):
+        self.pool = pool
+        self.priority = priority
+
+    def run(self, job, items, on_result=None):
+        """
+        Runs `job` over `items`; returns [(item, result)] in completion order,
+        with result None for jobs that raised. `on_result(item, result)` is
+        called as each job finishes.
+        """
+        return asyncio.run(self.run_async(job, items, on_result))
+
+    async def run_async(self, job, items, on_result=None):
+        slots = asyncio.Semaphore(self.pool.size)
+        with ThreadPoolExecutor(max_workers=self.pool.size, thread_name_prefix="crawl") as executor:
+            tasks = [asyncio.create_task(self._run_job(executor, slots, job, item)) for item in items]
+            results = []
+            for task in asyncio.as_completed(tasks):
+                item, result = await task
+                if on_result:
+                    on_result(item, result)
+                results.append((item, result))
+            return results
+
+    async def _run_job(self, executor, slots, job, item):
+        loop = asyncio.get_running_loop()
+        async with slots:
+            try:
+                driver = await loop.run_in_executor(executor, self.pool.acquire, self.priority)
+            except Exception as e:
+                logging.error(f"❌ No browser session for {item}: {e}")
+                return item, None
+
+            try:
+                return item, await loop.run_in_executor(executor, job, driver, item)
+            except Exception as e:
+                logging.error(f"❌ Job failed for {item}: {e}")
+                return item, None
+            finally:
+                await loop.run_in_executor(executor, self.pool.release, driver)
+
+def run_jobs(job, items, pool=None, driver=None, on_result=None, priority=False):
+    """
+    Runs `job(driver, item)` over `items` concurrently on `pool` if given, else
+    one after another on `driver`. Returns [(item, result)], result None on error;
+    `on_result(item, result)` is called as each job finishes. With `priority`,
+    the jobs get pooled sessions ahead of other callers (e.g. detail workers).
+    """
+    if pool is not None:
+        return CrawlOrchestrator(pool, priority).run(job, items, on_result)
+
+    results = []
+    for item in items:
+        try:
+            result = job(driver, item)
+        except Exception as e:
+            logging.error(f"❌ Job failed for {item}: {e}")
+            result = None
+        if on_result:
+            on_result(item, result)
+        results.append((item, result))
+    return results
@@ -0,0 +1,99 @@
+# replay.py
+
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from scraper.category_scraper import LaptopCategoryScraper, merge_cards, parse_product_cards
+from scraper.product_scraper import parse_specifications, parse_review_page
+from utils.review_index import ReviewIndex
+from utils.snapshot_store import read_snapshot
+
+def _parse_listing(root, url, sha):
+    return parse_product_cards(read_snapshot(root, sha), base_url=url)
+
+def _parse_detail(root, detail_sha, review_shas):
+    specs = parse_specifications(read_snapshot(root, detail_sha))
+    return specs, [parse_review_page(read_snapshot(root, sha)) for sha in review_shas]
+
+def assemble_details(specs, review_pages, known_reviews=None, partial=False):
+    """
+    Builds {"full_specs", "all_reviews"} from parsed snapshot pages the way a live
+    crawl would: review pages captured incrementally (`partial`) only hold the
+    newest reviews, so they are merged in front of `known_reviews` up to the
+    first page with nothing new; complete captures replace the stored reviews.
+    """
+    if partial and known_reviews:
+        index = ReviewIndex(known_reviews)
+        fresh = []
+        for page in review_pages:
+            page_fresh = index.new_reviews(page)
+            if not page_fresh:
+                break
+            fresh.extend(page_fresh)
+        reviews = index.merge(fresh)
+    else:
+        reviews = [review for page in review_pages for review in page]
+
+    return {
+        "full_specs": specs if specs else "N/A",
+        "all_reviews": reviews
+    }
+
+class SnapshotReplayer:
+    """
+    Re-runs the listing/detail extraction over saved HTML snapshots, without a browser.
+
+    Parsing is CPU-bound, so snapshots are parsed on a process pool; results are
+    handed back to the caller, which writes them exactly like a live crawl.
+    """
+
+    def __init__(self, snapshots, processes=None):
+        self.snapshots = snapshots
+        self.processes = processes or os.cpu_count() or 1
+
+    def replay_listing(self, manifest=None, store=None):
+        """
+        Re-parses every listing snapshot and saves the products (de-duplicated by
+        SKU, keeping the most complete card). Returns the products.
+        """
+        entries = self.snapshots.entries("listing")
+        with ProcessPoolExecutor(max_workers=self.processes) as executor:
+            roots = [self.snapshots.root] * len(entries)
+            urls = [url for url, _, _ in entries]
+            shas = [sha for _, _, sha in entries]
+            cards = merge_cards(raw for raw_cards in executor.map(_parse_listing, roots, urls, shas) for raw in raw_cards)
+
+        logging.info(f"🔁 Re-parsed {len(cards)} product cards from {len(entries)} listing snapshots.")
+        scraper = LaptopCategoryScraper(None, manifest=manifest, store=store)
+        return scraper.save_products(cards)
+
+    def replay_details(self, jobs):
+        """
+        `jobs` is [(item, url, known_reviews)]. Yields (item, details) in order,
+        with details None when no detail snapshot exists for the URL.
+        """
+        parse_jobs = []
+        for item, url, known_reviews in jobs:
+            detail = self.snapshots.pages(url, "detail")
+            reviews = self.snapshots.pages(url, "reviews")
+            if not detail:
+                parse_jobs.append((item, None, None, None, None))
+                continue
+            partial = any(page_partial for _, _, page_partial in reviews)
+            parse_jobs.append((item, detail[0][1], [sha for _, sha, _ in reviews], known_reviews, partial))
+
+        runnable = [job for job in parse_jobs if job[1] is not None]
+        with ProcessPoolExecutor(max_workers=self.processes) as executor:
+            parsed = executor.map(
+                _parse_detail,
+                [self.snapshots.root] * len(runnable),
+                [job[1] for job in runnable],
+                [job[2] for job in runnable],
+                chunksize=max(1, len(runnable) // (self.processes * 4)),
+            )
+            for item, detail_sha, _, known_reviews, partial in parse_jobs:
+                if detail_sha is None:
+                    yield item, None
+                    continue
+                specs, review_pages = next(parsed)
+                yield item, assemble_details(specs, review_pages, known_reviews, partial)
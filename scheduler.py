@@ -0,0 +1,116 @@
+# scheduler.py
+
+import time
+import logging
+from config import CATEGORY_STALENESS_BUCKET, DETAIL_MAX_AGE
+from orchestrator import run_jobs
+from scraper.category_scraper import LaptopCategoryScraper, listing_page_url, merge_cards
+from utils.url_utils import product_key
+
+class CategoryScheduler:
+    """
+    Crawls the listings of several registry categories over one shared set of
+    browser sessions (a BrowserPool, or a single driver).
+
+    Categories are ordered most-stale first (never-listed ones first, then by the
+    last listing time in the manifest, in CATEGORY_STALENESS_BUCKET steps) and,
+    within the same step, largest first (page count of the last crawl). The
+    first page of every category is read first, since it tells the page count;
+    then the remaining pages of all categories are queued in that order onto
+    the same sessions, so no session waits for one category to finish before
+    starting the next.
+
+    Products are saved as each page comes in (and, with a `frontier`, queued for
+    their detail visit), so detail workers can start before the listing ends.
+    """
+
+    def __init__(self, categories, manifest, pool=None, driver=None, store=None, snapshots=None,
+                 frontier=None, detail_max_age=DETAIL_MAX_AGE, staleness_bucket=CATEGORY_STALENESS_BUCKET):
+        self.categories = categories
+        self.manifest = manifest
+        self.pool = pool
+        self.driver = driver
+        self.store = store
+        self.snapshots = snapshots
+        self.frontier = frontier
+        self.detail_max_age = detail_max_age
+        self.staleness_bucket = staleness_bucket
+        self._cards = {}
+        self._products = {}
+
+    def priority(self, category):
+        state = self.manifest.category_state(category.name)
+        # Bucketed, so categories listed in the same crawl tie and are ordered by page count
+        staleness = int((time.time() - state.get("epoch", 0)) // max(self.staleness_bucket, 1))
+        return staleness, state.get("pages", 1)
+
+    def ordered(self):
+        return sorted(self.categories, key=self.priority, reverse=True)
+
+    def run(self):
+        """
+        Lists every category and saves its products. Returns all saved products.
+        """
+        ordered = self.ordered()
+        logging.info(f"🗓️ Listing order: {[c.name for c in ordered]}")
+
+        page_counts = {}
+        page_jobs = []
+
+        def on_first_page(category, result):
+            if result is None:
+                logging.error(f"❌ Could not open the first {category.name} page; skipping category.")
+                return
+            raw_cards, page_count, url = result
+            page_counts[category.name] = min(page_count, category.max_pages)
+            page_jobs.extend((category, url, page) for page in range(2, page_counts[category.name] + 1))
+            logging.info(f"📄 {category.name}: {page_counts[category.name]} page(s); {len(raw_cards)} cards on page 1.")
+            self._save(category, raw_cards)
+
+        def on_page(item, raw_cards):
+            category, _, page = item
+            if raw_cards is None:
+                logging.warning(f"⚠️ {category.name} page {page} returned no cards.")
+                return
+            self._save(category, raw_cards)
+
+        # Listing pages get pooled sessions ahead of the detail workers sharing the pool
+        run_jobs(self._read_first_page, ordered, self.pool, self.driver, on_result=on_first_page, priority=True)
+        # Keep the priority order of categories for their remaining pages
+        rank = {category.name: idx for idx, category in enumerate(ordered)}
+        page_jobs.sort(key=lambda job: (rank[job[0].name], job[2]))
+        run_jobs(self._read_page, page_jobs, self.pool, self.driver, on_result=on_page, priority=True)
+
+        products = []
+        for category in ordered:
+            if category.name not in page_counts:
+                continue
+            saved = list(self._products.get(category.name, {}).values())
+            self.manifest.record_category(category.name, page_counts[category.name], len(saved))
+            logging.info(f"✅ {category.name}: {len(saved)} unique products from {page_counts[category.name]} page(s).")
+            products.extend(saved)
+        return products
+
+    def _save(self, category, raw_cards):
+        """
+        Saves the cards not seen before in this run (or read more completely now).
+        """
+        fresh = merge_cards(raw_cards, self._cards.setdefault(category.name, {}))
+        if not fresh:
+            return
+
+        scraper = LaptopCategoryScraper(
+            None, manifest=self.manifest, store=self.store, category=category,
+            frontier=self.frontier, detail_max_age=self.detail_max_age
+        )
+        saved = self._products.setdefault(category.name, {})
+        for product in scraper.save_products(fresh):
+            saved[product_key(product)] = product
+
+    def _read_first_page(self, driver, category):
+        return LaptopCategoryScraper(driver, snapshots=self.snapshots, category=category).read_first_page()
+
+    def _read_page(self, driver, item):
+        category, url, page = item
+        scraper = LaptopCategoryScraper(driver, snapshots=self.snapshots, category=category)
+        return scraper.open_page(listing_page_url(url, page))
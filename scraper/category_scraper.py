@@ -1,82 +1,231 @@
 # scraper/category_scraper.py
 
 import logging
+import math
+import re
+import time
+from urllib.parse import urljoin
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import NoSuchElementException
-from utils.wait_utils import wait_for_element
-from utils.delay_utils import apply_random_delay
+from browser_manager import BrowserManager
+from config import BASE_URL, DETAIL_MAX_AGE
+from utils.wait_utils import wait_for_any, wait_for_element, wait_for_page_ready, wait_for_value_change
+from utils.delay_utils import throttle
+from utils.category_registry import default_category
 from utils.json_utils import save_product_json  # ← Import this
+from utils.snapshot_store import parse_html
+from utils.url_utils import product_key
+
+PRODUCT_CARD = (By.CSS_SELECTOR, "ul.plp-product-list > li")
+US_SPLASH_LINK = (By.CSS_SELECTOR, "a.us-link")
+SITE_HEADER_SEARCH = (By.CSS_SELECTOR, "input#gh-search-input")
+PAGE_HEIGHT_JS = "return document.body.scrollHeight"
+
+LISTING_RATING_PATTERN = re.compile(r"Rating\s+([0-9.]+)\s+out of 5")
+PAGE_PARAM_PATTERN = re.compile(r"([?&])cp=\d+(&|$)")
+
+# Pagination info from the first results page: the highest `cp=` page number
+# linked or labelled in the pager, and the total result count if shown
+# ("1-18 of 43 items").
+PAGE_COUNT_JS = """
+const linked = Array.from(document.querySelectorAll("a[href*='cp=']")).map((a) => {
+    const match = a.href.match(/[?&]cp=(\\d+)/);
+    return match ? parseInt(match[1], 10) : 0;
+});
+const labelled = Array.from(document.querySelectorAll(".paging-list a, .pagination a, [class*='pagination'] a"))
+    .map((a) => parseInt((a.innerText || "").trim(), 10))
+    .filter((n) => !isNaN(n));
+const countText = document.querySelector(".item-count, [class*='item-count'], [class*='results-count']");
+const total = countText ? (countText.innerText || "").match(/of\\s+([\\d,]+)/) : null;
+return {
+    max_page: Math.max(1, ...linked, ...labelled),
+    total_items: total ? parseInt(total[1].replace(/,/g, ""), 10) : null
+};
+"""
+
+# Reads every listing card currently in the DOM. Field names mirror
+# LaptopCategoryScraper.read_product_cards(); missing elements come back as null.
+CARD_READER_JS = """
+const text = (el) => el ? (el.innerText || el.textContent || "") : null;
+const readCards = () => Array.from(document.querySelectorAll("ul.plp-product-list > li")).map((card) => {
+    const title = card.querySelector("h2.product-title");
+    const link = card.querySelector("a.product-list-item-link");
+    return {
+        brand: text(card.querySelector("span.first-title")),
+        model: text(card.querySelector("span.value")),
+        price: text(card.querySelector("div[data-testid='medium-customer-price']")),
+        rating_text: text(card.querySelector("p.visually-hidden")),
+        reviews: text(card.querySelector("span.c-reviews.order-2")),
+        title: title ? title.getAttribute("title") : null,
+        title_text: text(title),
+        url: link ? link.href : null
+    };
+});
+"""
+
+# Reads every listing card in one round trip.
+CARD_SNAPSHOT_JS = CARD_READER_JS + "return readCards();"
+
+# One harvest step: scrolls by arguments[0] pixels and returns the cards in the
+# DOM, whether the viewport reached the bottom, and how long (ms) the product
+# list has gone without a mutation (tracked by a MutationObserver installed on
+# the first call).
+HARVEST_STEP_JS = CARD_READER_JS + """
+if (!window.__scraperCardObserver) {
+    window.__scraperLastCardMutation = Date.now();
+    window.__scraperCardObserver = new MutationObserver(() => { window.__scraperLastCardMutation = Date.now(); });
+    window.__scraperCardObserver.observe(document.body, {childList: true, subtree: true});
+}
+if (arguments[0]) {
+    window.scrollBy(0, arguments[0]);
+}
+const root = document.scrollingElement || document.documentElement;
+return {
+    cards: readCards(),
+    at_bottom: window.innerHeight + window.scrollY >= root.scrollHeight - 2,
+    quiet_ms: Date.now() - window.__scraperLastCardMutation
+};
+"""
+
+def _filled_fields(raw):
+    return sum(1 for value in raw.values() if value)
+
+def merge_cards(raw_cards, merged=None):
+    """
+    De-duplicates raw cards by SKU/URL, keeping the most complete reading of each.
+
+    `merged` ({key: card} of earlier readings) is updated in place when given.
+    Returns the cards that were added or replaced a less complete reading.
+    """
+    merged = {} if merged is None else merged
+    updated = {}
+    for raw in raw_cards:
+        key = product_key(raw)
+        if not key:
+            continue
+        previous = merged.get(key)
+        if previous is None or _filled_fields(raw) > _filled_fields(previous):
+            merged[key] = updated[key] = raw
+    return list(updated.values())
+
+def listing_page_url(url, page):
+    """
+    Returns the listing URL for result page `page` (the `cp=` query parameter).
+    """
+    url = PAGE_PARAM_PATTERN.sub(lambda m: m.group(1) if m.group(2) else "", url).rstrip("?&")
+    if page <= 1:
+        return url
+    return f"{url}{'&' if '?' in url else '?'}cp={page}"
+
+def parse_product_cards(html, base_url=None):
+    """
+    Offline counterpart of `CARD_SNAPSHOT_JS`: reads the same raw card fields from
+    saved listing HTML (see utils.snapshot_store). Keep the selectors in sync.
+    """
+    def text(el):
+        return el.get_text() if el is not None else None
+
+    raw_cards = []
+    for card in parse_html(html).select("ul.plp-product-list > li"):
+        title = card.select_one("h2.product-title")
+        link = card.select_one("a.product-list-item-link")
+        href = link.get("href") if link is not None else None
+        raw_cards.append({
+            "brand": text(card.select_one("span.first-title")),
+            "model": text(card.select_one("span.value")),
+            "price": text(card.select_one("div[data-testid='medium-customer-price']")),
+            "rating_text": text(card.select_one("p.visually-hidden")),
+            "reviews": text(card.select_one("span.c-reviews.order-2")),
+            "title": title.get("title") if title is not None else None,
+            "title_text": text(title),
+            "url": urljoin(base_url, href) if href and base_url else href,
+        })
+    return raw_cards
 
 class LaptopCategoryScraper:
     """
-    Scrapes filtered laptop product listings from BestBuy.
-    Filters (already applied in URL):
+    Scrapes filtered product listings from BestBuy for one registry category
+    (utils.category_registry; default: the first enabled entry of categories.json).
+    The default "laptops" entry applies these filters in the URL:
     - Price: $500–$1500
     - Brands: HP, Dell, Lenovo
     - Rating: 4+ stars
     """
 
-    def __init__(self, driver):
+    def __init__(self, driver, manifest=None, store=None, snapshots=None, category=None,
+                 frontier=None, detail_max_age=DETAIL_MAX_AGE):
         self.driver = driver
+        self.manifest = manifest
+        self.store = store
+        self.snapshots = snapshots
+        self.category = category
+        self.frontier = frontier
+        self.detail_max_age = detail_max_age
         self.products = []
 
     def navigate_to_laptops(self):
         """
-        Navigates to the filtered laptops category page after handling country selection.
+        Navigates to the filtered category page after handling country selection.
+
+        When the driver runs on a warm persistent profile (see BrowserManager), the
+        homepage/splash hop is skipped; if the splash shows up anyway the saved
+        state is discarded and the full hop is done.
         """
+        category = self.category or default_category()
         try:
-            base_url = "https://www.bestbuy.com/"
+            if BrowserManager.has_warm_state(self.driver):
+                logging.info("Warm profile found. Skipping homepage/splash hop.")
+                throttle(category.url)
+                self.driver.get(category.url)
+                match_idx, _ = wait_for_any(self.driver, [PRODUCT_CARD, US_SPLASH_LINK], timeout=15)
+                if match_idx != 1:
+                    logging.info(f"Navigated to filtered {category.name} category.")
+                    return
+                logging.info("Splash shown despite warm profile; redoing country selection.")
+                BrowserManager.clear_warm_state(self.driver)
+
+            base_url = BASE_URL
             logging.info("Opening BestBuy homepage...")
+            throttle(base_url)
             self.driver.get(base_url)
-            apply_random_delay()
 
-            # ✅ Step 1: Click "United States" if splash appears
+            # ✅ Step 1: Click "United States" if splash appears (stop waiting as soon as
+            # the regular header shows up instead)
             try:
-                from selenium.webdriver.common.by import By
-                from utils.wait_utils import wait_for_element
-
-                us_link = wait_for_element(self.driver, (By.CSS_SELECTOR, "a.us-link"), timeout=5)
-                if us_link:
+                match_idx, us_link = wait_for_any(self.driver, [US_SPLASH_LINK, SITE_HEADER_SEARCH], timeout=5)
+                if match_idx == 0:
+                    throttle(base_url)
                     us_link.click()
                     logging.info("Selected 'United States' on splash screen.")
-                    apply_random_delay()
                 else:
                     logging.info("No splash screen found. Proceeding directly.")
 
             except Exception as splash_err:
                 logging.warning(f"Splash handling skipped or failed: {splash_err}")
 
-            # ✅ Step 2: Navigate to the filtered laptops URL with "intl=nosplash"
-            laptops_url = (
-                "https://www.bestbuy.com/site/searchpage.jsp?"
-                "id=pcat17071&qp=currentprice_facet%3DPrice%7E500+to+1500"
-                "%5Ebrand_facet%3DBrand%7ELenovo%5Ebrand_facet%3DBrand%7EHP"
-                "%5Ebrand_facet%3DBrand%7EDell%5Ecustomerreviews_facet%3D"
-                "Customer+Rating%7E4+%26+Up&st=laptops&intl=nosplash"
-            )
-
-            self.driver.get(laptops_url)
-            apply_random_delay()
-            logging.info("Navigated to filtered laptops category.")
+            # ✅ Step 2: Navigate to the filtered category URL with "intl=nosplash"
+            throttle(category.url)
+            self.driver.get(category.url)
+            wait_for_page_ready(self.driver)
+            BrowserManager.mark_warm_state(self.driver)
+            logging.info(f"Navigated to filtered {category.name} category.")
 
         except Exception as e:
-            logging.error(f"Error in laptop navigation: {e}")
+            logging.error(f"Error in {category.name} navigation: {e}")
             raise
         
     def scroll_to_load_all_products(self, pause_time=2, max_attempts=20):
         """
         Scrolls slowly down the page to load all lazy-loaded product cards.
-        Stops when no new content is loaded after several attempts.
+        Each step waits up to `pause_time` for the page to grow, moving on as
+        soon as it does. Stops when no new content is loaded after several attempts.
         """
-        import time
-
-        last_height = self.driver.execute_script("return document.body.scrollHeight")
+        last_height = self.driver.execute_script(PAGE_HEIGHT_JS)
         attempts = 0
 
         while attempts < max_attempts:
             self.driver.execute_script("window.scrollBy(0, 1000);")
-            time.sleep(pause_time)
-            new_height = self.driver.execute_script("return document.body.scrollHeight")
+            new_height = wait_for_value_change(self.driver, PAGE_HEIGHT_JS, last_height, timeout=pause_time)
 
             if new_height == last_height:
                 attempts += 1
@@ -85,140 +234,253 @@ class LaptopCategoryScraper:
 
             last_height = new_height
             
-    # def extract_all_pages(self):
-    #     """
-    #     Handles pagination: scrapes product cards across all pages.
-    #     """
-    #     try:
-    #         page = 1
-    #         while True:
-    #             logging.info(f"📄 Scraping Page {page}")
-    #             self.extract_product_cards()
-    #             apply_random_delay()
-
-    #             try:
-    #                 # ✅ Find "Next" button using correct selector
-    #                 next_button = self.driver.find_element(By.CSS_SELECTOR, "a.pagination-arrow[aria-label='Next page']")
-                    
-    #                 # Check if it's disabled
-    #                 if next_button.get_attribute("aria-disabled") == "true":
-    #                     logging.info("❌ 'Next' button is disabled. Reached last page.")
-    #                     break
-
-    #                 # ✅ Click "Next"
-    #                 self.driver.execute_script("arguments[0].click();", next_button)
-    #                 logging.info("➡️ Clicked next page.")
-    #                 page += 1
-    #                 apply_random_delay()
-
-    #             except Exception as e:
-    #                 logging.info("✅ Reached last page or 'Next' button not found.")
-    #                 break
-
-    #     except Exception as e:
-    #         logging.error(f"❌ Error during pagination scraping: {e}")
+    def harvest_product_cards(self, step=1000, settle_ms=300, quiet_ms=1500, poll_interval=0.1, max_seconds=120):
+        """
+        Scrolls the listing and collects cards while they load, de-duplicated by
+        SKU/URL, so cards a virtualised list drops off-screen are not lost.
 
+        Each step scrolls only once the product list has gone `settle_ms` without a
+        DOM mutation; harvesting stops when the viewport is at the bottom and the
+        list has been quiet for `quiet_ms`.
+        """
+        harvested = {}
+        deadline = time.monotonic() + max_seconds
+        settled = True
 
+        while time.monotonic() < deadline:
+            state = self.driver.execute_script(HARVEST_STEP_JS, step if settled else 0)
 
-            
-    def extract_product_cards(self):
+            # Keep the most complete reading of each card (hydration may lag).
+            merge_cards(state["cards"], harvested)
+
+            if state["at_bottom"] and state["quiet_ms"] >= quiet_ms:
+                break
+
+            settled = state["quiet_ms"] >= settle_ms
+            time.sleep(poll_interval)
+        else:
+            logging.warning(f"⚠️ Card harvest hit the {max_seconds}s limit; keeping {len(harvested)} cards.")
+
+        return list(harvested.values())
+
+    def read_first_page(self):
         """
-        Extracts product information after ensuring product cards are visible.
+        Opens the listing and returns (raw cards, page count, listing URL).
+        """
+        self.navigate_to_laptops()
+        raw_cards = self.collect_product_cards()
+        url = listing_page_url(self.driver.current_url, 1)
+
+        info = self.driver.execute_script(PAGE_COUNT_JS) or {}
+        page_count = int(info.get("max_page") or 1)
+        total_items = info.get("total_items")
+        if total_items and raw_cards:
+            page_count = max(page_count, math.ceil(total_items / len(raw_cards)))
+        return raw_cards, page_count, url
+
+    def open_page(self, url):
+        """
+        Opens one listing result page directly and returns its raw cards.
+        """
+        throttle(url)
+        self.driver.get(url)
+        wait_for_page_ready(self.driver)
+        return self.collect_product_cards()
+
+    def extract_product_cards(self, bulk=True, incremental=True):
+        """
+        Extracts and saves the product cards of the current page.
         """
         try:
-            apply_random_delay()
-            
+            raw_cards = self.collect_product_cards(bulk=bulk, incremental=incremental)
+            self.save_products(raw_cards)
+            logging.info(f"✅ Finished scraping. Total products extracted: {len(self.products)}")
+
+        except Exception as e:
+            logging.error(f"❌ Error extracting product cards: {e}")
+
+    def collect_product_cards(self, bulk=True, incremental=True):
+        """
+        Returns the raw fields of every product card on the current page after
+        ensuring the cards are visible.
+
+        With `bulk=True` every card is read in a single `execute_script` snapshot
+        instead of ~7 WebDriver round trips per card; the per-element path is
+        used as a fallback if the snapshot fails. With `incremental=True` (bulk
+        only) cards are harvested during the scroll instead of after it.
+        """
+        # ✅ Wait until at least one product card is visible
+        wait_for_element(self.driver, PRODUCT_CARD, timeout=15)
+
+        raw_cards = None
+        if bulk and incremental:
+            try:
+                raw_cards = self.harvest_product_cards()
+            except Exception as e:
+                logging.warning(f"⚠️ Incremental card harvest failed, falling back to full scroll: {e}")
+
+        if raw_cards is None:
             # Scroll down gradually to load all product cards
             self.scroll_to_load_all_products()
 
-            # ✅ Wait until at least one product card is visible
-            wait_for_element(self.driver, (By.CSS_SELECTOR, "ul.plp-product-list > li"), timeout=15)
-            product_cards = self.driver.find_elements(By.CSS_SELECTOR, "ul.plp-product-list > li")
-
-            logging.info(f"Found {len(product_cards)} product cards.")
-
-            for idx, card in enumerate(product_cards):
-                logging.info(f"Scraping product card {idx + 1}...")
-
-                try:
-                    # ✅ Product Name from brand (first-title) and model (value)
-                    brand_elem = card.find_elements(By.CSS_SELECTOR, "span.first-title")
-                    model_elem = card.find_elements(By.CSS_SELECTOR, "span.value")
-
-                    brand = brand_elem[0].text.strip() if brand_elem else ""
-                    model = model_elem[0].text.strip() if model_elem else ""
-
-                    # Combine them into full name
-                    if brand or model:
-                        name = f"{brand} {model}".strip()
-                    else:
-                        name = "N/A"
-
-
-                    # ✅ Price (medium-customer-price class)
-                    price_elem = card.find_elements(By.XPATH, ".//div[@data-testid='medium-customer-price']")
-                    price = price_elem[0].text.replace("$", "").replace(",", "").strip() if price_elem else "N/A"
-
-                    # ✅ Rating (from visually-hidden tag)
-                    rating_elem = card.find_elements(By.CSS_SELECTOR, "p.visually-hidden")
-                    rating = "N/A"
-
-                    if rating_elem:
-                        rating_text = rating_elem[0].text.strip()  # e.g., "Rating 4.6 out of 5 stars with 68 reviews"
-                        try:
-                            import re
-                            match = re.search(r"Rating\s+([0-9.]+)\s+out of 5", rating_text)
-                            if match:
-                                rating = match.group(1)
-                        except Exception as e:
-                            logging.warning(f"Error parsing rating from visually-hidden: {e}")
-
-
-                    # ✅ Reviews count (from c-reviews order-2)
-                    reviews_elem = card.find_elements(By.XPATH, ".//span[contains(@class, 'c-reviews') and contains(@class, 'order-2')]")
-                    review_count = reviews_elem[0].text.strip("()") if reviews_elem else "0"
-
-                    # ✅ Specifications from product-title h2 and URL from <a>
-                    link_elem = card.find_elements(By.CSS_SELECTOR, "a.product-list-item-link")
-                    product_url = link_elem[0].get_attribute("href") if link_elem else None
-
-                    spec_elem = card.find_elements(By.CSS_SELECTOR, "h2.product-title")
-                    if spec_elem:
-                        specs = spec_elem[0].get_attribute("title") or spec_elem[0].text.strip()
-                    else:
-                        specs = "N/A"
-
-                    # ✅ Save product data
-                    self.products.append({
-                        "name": name,
-                        "price": price,
-                        "rating": rating,
-                        "reviews": review_count,
-                        "specs": specs,
-                        "product_url": product_url
-                    })
-
-                    # logging.info(f"✅ Scraped: {name} | ${price} | Rating: {rating} | Reviews: {review_count}")
-                    
-                    # Inside your loop after you build the product_data dictionary
-                    save_product_json({
-                        "name": name,
-                        "price": price,
-                        "rating": rating,
-                        "reviews": review_count,
-                        "specs": specs,
-                        "product_url": product_url
-                    })
-
-                except Exception as e:
-                    logging.warning(f"⚠️ Error parsing product card {idx + 1}: {e}")
+        if raw_cards is None and bulk:
+            try:
+                raw_cards = self.snapshot_product_cards()
+            except Exception as e:
+                logging.warning(f"⚠️ Bulk card snapshot failed, falling back to per-element scraping: {e}")
 
-            logging.info(f"✅ Finished scraping. Total products extracted: {len(self.products)}")
+        if raw_cards is None:
+            raw_cards = self.read_product_cards()
+
+        logging.info(f"Found {len(raw_cards)} product cards.")
+        self.save_snapshot()
+        return raw_cards
+
+    def save_products(self, raw_cards):
+        """
+        Builds products from raw card fields and saves them to JSON (or the store),
+        recording each in the manifest and queueing those that need a detail visit
+        in the frontier. Also used by the offline replay.
+        """
+        saved = []
+        for idx, raw in enumerate(raw_cards):
+            try:
+                product = self.build_product(raw)
+                if self.category:
+                    product["category"] = self.category.name
+
+                # ✅ Save product data (one batched write at the end when using the store)
+                saved.append(product)
+                if self.store:
+                    continue
+                path = save_product_json(dict(product))
+
+                if self.manifest and path:
+                    changed = self.manifest.record_listing(product, path)
+                    self.enqueue_detail(product, path, changed)
+
+            except Exception as e:
+                logging.warning(f"⚠️ Error parsing product card {idx + 1}: {e}")
+
+        if self.store and saved:
+            self.store.upsert_products(saved)
+            if self.manifest:
+                for product in saved:
+                    changed = self.manifest.record_listing(product, None)
+                    self.enqueue_detail(product, None, changed)
+
+        self.products.extend(saved)
+        return saved
+
+    def enqueue_detail(self, product, path, changed):
+        """
+        Pushes a product to the frontier if it is new/changed (high priority) or its details are stale.
+        """
+        if not self.frontier:
+            return
+        key = product_key(product)
+        if changed or self.manifest.needs_detail(key, self.detail_max_age):
+            self.frontier.push(key, product.get("product_url"), path, priority=1 if changed else 0)
 
+    def save_snapshot(self, page=0):
+        """
+        Saves the current listing HTML to the snapshot store, if one is configured.
+        """
+        if not self.snapshots:
+            return
+        try:
+            self.snapshots.put(self.driver.current_url, "listing", self.driver.page_source, page=page)
         except Exception as e:
-            logging.error(f"❌ Error extracting product cards: {e}")
-            
+            logging.warning(f"⚠️ Could not save listing snapshot: {e}")
+
+    def snapshot_product_cards(self):
+        """
+        Returns the raw fields of every listing card from one script round trip.
+        """
+        raw_cards = self.driver.execute_script(CARD_SNAPSHOT_JS)
+        if not isinstance(raw_cards, list):
+            raise ValueError(f"Unexpected card snapshot result: {type(raw_cards).__name__}")
+        return raw_cards
+
+    def read_product_cards(self):
+        """
+        Per-element fallback: reads the same raw fields as `CARD_SNAPSHOT_JS`
+        through individual WebDriver calls.
+        """
+        product_cards = self.driver.find_elements(*PRODUCT_CARD)
+        raw_cards = []
 
+        for idx, card in enumerate(product_cards):
+            logging.info(f"Scraping product card {idx + 1}...")
+            try:
+                # ✅ Product Name from brand (first-title) and model (value)
+                brand_elem = card.find_elements(By.CSS_SELECTOR, "span.first-title")
+                model_elem = card.find_elements(By.CSS_SELECTOR, "span.value")
+
+                # ✅ Price (medium-customer-price class)
+                price_elem = card.find_elements(By.XPATH, ".//div[@data-testid='medium-customer-price']")
+
+                # ✅ Rating (from visually-hidden tag)
+                rating_elem = card.find_elements(By.CSS_SELECTOR, "p.visually-hidden")
+
+                # ✅ Reviews count (from c-reviews order-2)
+                reviews_elem = card.find_elements(By.XPATH, ".//span[contains(@class, 'c-reviews') and contains(@class, 'order-2')]")
+
+                # ✅ Specifications from product-title h2 and URL from <a>
+                link_elem = card.find_elements(By.CSS_SELECTOR, "a.product-list-item-link")
+                spec_elem = card.find_elements(By.CSS_SELECTOR, "h2.product-title")
+
+                raw_cards.append({
+                    "brand": brand_elem[0].text if brand_elem else None,
+                    "model": model_elem[0].text if model_elem else None,
+                    "price": price_elem[0].text if price_elem else None,
+                    "rating_text": rating_elem[0].text if rating_elem else None,
+                    "reviews": reviews_elem[0].text if reviews_elem else None,
+                    "title": spec_elem[0].get_attribute("title") if spec_elem else None,
+                    "title_text": spec_elem[0].text if spec_elem else None,
+                    "url": link_elem[0].get_attribute("href") if link_elem else None,
+                })
+            except Exception as e:
+                logging.warning(f"⚠️ Error reading product card {idx + 1}: {e}")
+
+        return raw_cards
+
+    @staticmethod
+    def build_product(raw):
+        """
+        Turns the raw card fields into the product dict stored in data/raw.
+        """
+        brand = (raw.get("brand") or "").strip()
+        model = (raw.get("model") or "").strip()
+
+        # Combine them into full name
+        name = f"{brand} {model}".strip() if brand or model else "N/A"
+
+        price_text = raw.get("price")
+        price = price_text.replace("$", "").replace(",", "").strip() if price_text is not None else "N/A"
+
+        rating = "N/A"
+        rating_text = (raw.get("rating_text") or "").strip()  # e.g., "Rating 4.6 out of 5 stars with 68 reviews"
+        match = LISTING_RATING_PATTERN.search(rating_text)
+        if match:
+            rating = match.group(1)
+
+        reviews_text = raw.get("reviews")
+        review_count = reviews_text.strip().strip("()") if reviews_text is not None else "0"
+
+        if raw.get("title") is not None or raw.get("title_text") is not None:
+            specs = raw.get("title") or (raw.get("title_text") or "").strip()
+        else:
+            specs = "N/A"
+
+        return {
+            "name": name,
+            "price": price,
+            "rating": rating,
+            "reviews": review_count,
+            "specs": specs,
+            "product_url": raw.get("url")
+        }
 
     def get_spec_snippet(self, card):
         """
@@ -1,93 +1,238 @@
 # scraper/product_scraper.py
 
 import logging
-import time
+import re
+from urllib.parse import urlencode, urlparse, parse_qsl, urlunparse
 from selenium.webdriver.common.by import By
+from config import PRODUCT_TIME_BUDGET, INCREMENTAL_REVIEWS
+from utils.delay_utils import throttle
 from utils.json_utils import load_product_json, update_product_json
-from utils.wait_utils import wait_for_element
+from utils.review_index import ReviewIndex
+from utils.snapshot_store import parse_html
+from utils.wait_utils import (
+    WaitBudget,
+    wait_for_dom_quiet,
+    wait_for_element,
+    wait_for_invisibility,
+    wait_for_page_ready,
+    wait_for_replacement,
+    wait_for_staleness,
+)
+
+REVIEW_ITEM = (By.CSS_SELECTOR, "li.review-item")
+# Query parameter that makes the review list newest-first. BestBuy may ignore it,
+# so the order is checked on the page before pagination relies on it.
+NEWEST_FIRST_SORT = ("sort", "MOST_RECENT")
+# Labels of the review sort control that mean newest-first.
+NEWEST_FIRST_LABELS = ("newest", "most recent")
+SPEC_BLOCK = (By.CSS_SELECTOR, "div.dB7j8sHUbncyf79K")
+SPEC_SHEET_CLOSE_BUTTON = (By.CSS_SELECTOR, "button[data-testid='brix-sheet-closeButton']")
+SEE_ALL_REVIEWS_BUTTON = (By.XPATH, "//button[.//span[contains(text(),'See All Customer Reviews')]]")
+
+# Text BestBuy renders instead of a review section when a product has no reviews;
+# seeing one means "See All Customer Reviews" will never appear.
+NO_REVIEWS_MARKERS = [
+    (By.XPATH, "//*[contains(text(),'Be the first to write a review')]"),
+    (By.XPATH, "//*[contains(text(),'This item doesn') and contains(text(),'t have reviews yet')]"),
+]
+
+REVIEW_RATING_PATTERN = re.compile(r"Rated ([0-9.]+) out of 5")
+
+# Reads the whole spec sheet in one round trip as [[label, value], ...].
+SPEC_SNAPSHOT_JS = """
+const text = (el) => el ? (el.innerText || el.textContent || "").trim() : "";
+return Array.from(document.querySelectorAll("div.dB7j8sHUbncyf79K")).map((block) => [
+    text(block.querySelector("div.font-weight-medium")),
+    text(block.querySelector("div.pl-300"))
+]);
+"""
+
+# Reads the current review page in one round trip. Reviews missing any of the
+# three fields come back as null, matching the per-element path which skips them.
+REVIEW_SNAPSHOT_JS = """
+const text = (el) => el ? (el.innerText || el.textContent || "") : null;
+return Array.from(document.querySelectorAll("li.review-item")).map((item) => {
+    const title = text(item.querySelector("h4.review-title"));
+    const body = text(item.querySelector("p.pre-white-space"));
+    const rating = text(item.querySelector("p.visually-hidden"));
+    if (title === null || body === null || rating === null) {
+        return null;
+    }
+    return {title: title, body: body, rating_text: rating};
+});
+"""
+
+def parse_specifications(html):
+    """
+    Offline counterpart of `SPEC_SNAPSHOT_JS` for saved detail-page HTML.
+    """
+    def text(el):
+        return el.get_text().strip() if el is not None else ""
+
+    specs = {}
+    for block in parse_html(html).select("div.dB7j8sHUbncyf79K"):
+        label = text(block.select_one("div.font-weight-medium"))
+        value = text(block.select_one("div.pl-300"))
+        if label and value:
+            specs[label] = value
+    return specs
+
+# Reads what the review list says about its order: the selected label of the
+# sort control (if any) and the posting time (ms since epoch, null if unreadable)
+# of each review on the page.
+REVIEW_ORDER_JS = """
+const control = document.querySelector("select#sort-by, select[aria-label*='sort' i], select[name*='sort' i]");
+const label = control && control.selectedIndex >= 0 ? control.options[control.selectedIndex].text : null;
+const stamp = (item) => {
+    const el = item.querySelector("time[datetime], .submission-date, .review-date");
+    if (!el) {
+        return null;
+    }
+    const raw = (el.getAttribute("datetime") || el.getAttribute("title") || el.textContent || "").trim();
+    const time = Date.parse(raw);
+    return isNaN(time) ? null : time;
+};
+return {sort_label: label, dates: Array.from(document.querySelectorAll("li.review-item")).map(stamp)};
+"""
+
+def newest_first_confirmed(order):
+    """
+    True if a `REVIEW_ORDER_JS` result shows the reviews newest-first: the sort
+    control (when present) names a newest-first sort and the review dates (when
+    at least two are readable) never go up. False if neither can be seen.
+    """
+    label = (order.get("sort_label") or "").strip().lower()
+    dates = [date for date in order.get("dates") or [] if date is not None]
+    if not label and len(dates) < 2:
+        return False
+    if label and not any(word in label for word in NEWEST_FIRST_LABELS):
+        return False
+    return all(earlier >= later for earlier, later in zip(dates, dates[1:]))
+
+def parse_review_page(html):
+    """
+    Offline counterpart of `REVIEW_SNAPSHOT_JS` for a saved review page.
+    """
+    reviews = []
+    for item in parse_html(html).select("li.review-item"):
+        title = item.select_one("h4.review-title")
+        body = item.select_one("p.pre-white-space")
+        rating = item.select_one("p.visually-hidden")
+        if title is None or body is None or rating is None:
+            continue
+        reviews.append(ProductDetailScraper.build_review({
+            "title": title.get_text(),
+            "body": body.get_text(),
+            "rating_text": rating.get_text()
+        }))
+    return reviews
 
 class ProductDetailScraper:
-    def __init__(self, driver):
+    def __init__(self, driver, time_budget=PRODUCT_TIME_BUDGET, incremental_reviews=INCREMENTAL_REVIEWS, snapshots=None):
         self.driver = driver
+        self.time_budget = time_budget
+        self.incremental_reviews = incremental_reviews
+        self.snapshots = snapshots
+        self.budget = None
+        self.url = None
 
     def scrape_product_page(self, json_path):
         """
         Loads a product JSON, opens the product URL, and scrapes full specs & all reviews.
+        Returns the {"full_specs", "all_reviews"} written to the file, or None if skipped.
         """
         data = load_product_json(json_path)
         url = data.get("product_url")
 
         if not url:
             logging.warning(f"No URL found in {json_path}. Skipping.")
-            return
+            return None
+
+        details = self.scrape_product(url, known_reviews=data.get("all_reviews"))
+
+        # ✅ 4. Update JSON file
+        update_product_json(json_path, details)
 
+        logging.info(f"✅ Updated {json_path} with full specs & reviews.")
+        return details
+
+    def scrape_product(self, url, known_reviews=None):
+        """
+        Opens a product URL and returns {"full_specs", "all_reviews"} without persisting them.
+
+        If `known_reviews` (the stored `all_reviews`) is non-empty and incremental
+        reviews are enabled, reviews are read newest-first and only new ones are
+        merged in front of the stored list.
+        """
+        throttle(url)
+        self.url = url
+        self.budget = WaitBudget(self.time_budget)
+        if self.snapshots:
+            self.snapshots.clear(url)
         self.driver.get(url)
-        time.sleep(3)  # Allow basic load
+        wait_for_page_ready(self.driver, budget=self.budget)
 
         # ✅ 1. Scrape Full Specs (as dictionary)
         specs = self.extract_specifications()
+        self.save_snapshot("detail")
         
         # ✅ 2. Close specs sheet if open
         try:
-            close_btn = self.driver.find_element(
-                By.CSS_SELECTOR,
-                "button[data-testid='brix-sheet-closeButton']"
-            )
+            close_btn = self.driver.find_element(*SPEC_SHEET_CLOSE_BUTTON)
             if close_btn.is_displayed() and close_btn.is_enabled():
                 close_btn.click()
                 logging.info("✅ Closed specification sheet.")
-                time.sleep(2)
+                wait_for_invisibility(self.driver, SPEC_SHEET_CLOSE_BUTTON, timeout=5, budget=self.budget)
         except Exception:
             logging.info("ℹ️ No spec sheet to close, or already closed.")
         
-        # ✅ 3. Scrape Reviews (all pages)
-        reviews = self.extract_all_reviews()
-
-        # ✅ 4. Update JSON file
-        update_product_json(json_path, {
+        # ✅ 3. Scrape Reviews (all pages, or only the new ones)
+        if self.incremental_reviews and known_reviews:
+            index = ReviewIndex(known_reviews)
+            new_reviews = self.extract_all_reviews(known=index)
+            logging.info(f"🆕 {len(new_reviews)} new reviews (had {len(index.reviews)}).")
+            reviews = index.merge(new_reviews)
+        else:
+            reviews = self.extract_all_reviews()
+
+        return {
             "full_specs": specs,
             "all_reviews": reviews
-        })
-
-        logging.info(f"✅ Updated {json_path} with full specs & reviews.")
+        }
 
-    def extract_specifications(self):
+    def extract_specifications(self, bulk=True):
+        """
+        Opens the spec sheet and returns it as a {label: value} dict (or "N/A").
+        With `bulk=True` the sheet is read in a single script call.
+        """
         try:
-            from selenium.webdriver.common.by import By
-            from utils.wait_utils import wait_for_element
-
             # ✅ First click the "Specifications" button to expand the section
             try:
                 spec_button = wait_for_element(self.driver, (
                     By.XPATH, "//button[.//h3[text()='Specifications']]"
-                ), timeout=10)
+                ), timeout=10, budget=self.budget)
 
                 if spec_button:
                     spec_button.click()
                     logging.info("Clicked 'Specifications' to reveal spec details.")
-                    time.sleep(2)  # small wait for animation/rendering
 
             except Exception as e:
                 logging.warning(f"'Specifications' button not found or not clickable: {e}")
                 return "N/A"
 
-            # ✅ Now wait for the spec blocks to load
-            wait_for_element(self.driver, (By.CSS_SELECTOR, "div.dB7j8sHUbncyf79K"), timeout=10)
-            spec_blocks = self.driver.find_elements(By.CSS_SELECTOR, "div.dB7j8sHUbncyf79K")
+            # ✅ Now wait for the spec blocks to load and finish rendering
+            if wait_for_element(self.driver, SPEC_BLOCK, timeout=10, budget=self.budget):
+                wait_for_dom_quiet(self.driver, quiet_ms=300, timeout=3, budget=self.budget)
 
-            specs = {}
-            for block in spec_blocks:
+            specs = None
+            if bulk:
                 try:
-                    label_elem = block.find_element(By.CSS_SELECTOR, "div.font-weight-medium")
-                    value_elem = block.find_element(By.CSS_SELECTOR, "div.pl-300")
-
-                    label = label_elem.text.strip()
-                    value = value_elem.text.strip()
+                    specs = self.snapshot_specifications()
+                except Exception as e:
+                    logging.warning(f"⚠️ Spec snapshot failed, falling back to per-element scraping: {e}")
 
-                    if label and value:
-                        specs[label] = value
-                except Exception:
-                    continue  # skip malformed entries
+            if specs is None:
+                specs = self.read_specifications()
 
             return specs if specs else "N/A"
 
@@ -95,25 +240,37 @@ class ProductDetailScraper:
             logging.warning(f"Failed to extract specs: {e}")
             return "N/A"
 
-    def extract_all_reviews(self):
+    def extract_all_reviews(self, bulk=True, known=None):
+        """
+        Opens the full review list and walks every page. With `bulk=True` each
+        page is read in a single script call.
+
+        With a `known` ReviewIndex the list is sorted newest-first and only
+        reviews missing from the index are returned. Pagination stops at the
+        first page that holds nothing new, but only if the page confirms the
+        newest-first order; otherwise every page is read.
+        """
         all_reviews = []
 
         try:
             # ✅ Step 1: Scroll down to bring "See All Customer Reviews" into view
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.7);")
-            time.sleep(2)  # Wait for lazy load
 
-            # ✅ Step 2: Click "See All Customer Reviews" if exists
+            # ✅ Step 2: Click "See All Customer Reviews" if exists (waits for the lazy-loaded
+            # review section, but gives up at once if the product has no reviews)
             try:
                 see_all_button = wait_for_element(
                     self.driver,
-                    (By.XPATH, "//button[.//span[contains(text(),'See All Customer Reviews')]]"),
-                    timeout=10
+                    SEE_ALL_REVIEWS_BUTTON,
+                    timeout=10,
+                    absent_locators=NO_REVIEWS_MARKERS,
+                    budget=self.budget
                 )
                 if see_all_button:
+                    throttle(self.driver.current_url)
                     see_all_button.click()
                     logging.info("✅ Clicked 'See All Customer Reviews' button.")
-                    time.sleep(3)
+                    wait_for_staleness(self.driver, see_all_button, timeout=10, budget=self.budget)
                 else:
                     logging.warning("⚠️ 'See All Customer Reviews' button not found.")
                     return []
@@ -122,28 +279,38 @@ class ProductDetailScraper:
                 logging.warning(f"⚠️ Could not click 'See All Customer Reviews': {click_err}")
                 return []
 
+            stop_early = known is not None and self.sort_reviews_newest_first()
+            if known is not None and not stop_early:
+                logging.warning("⚠️ Newest-first review order not confirmed; reading every review page.")
+
             # ✅ Step 3: Begin scraping all reviews
-            while True:
-                wait_for_element(self.driver, (By.CSS_SELECTOR, "li.review-item"))
-                review_blocks = self.driver.find_elements(By.CSS_SELECTOR, "li.review-item")
+            first_item = wait_for_element(self.driver, REVIEW_ITEM, budget=self.budget)
+            page = 0
+            while first_item:
+                if self.budget and self.budget.expired:
+                    logging.warning(f"⏱️ Time budget exhausted after {len(all_reviews)} reviews; stopping pagination.")
+                    break
 
-                for block in review_blocks:
+                page_reviews = None
+                if bulk:
                     try:
-                        title = block.find_element(By.CSS_SELECTOR, "h4.review-title").text
-                        body = block.find_element(By.CSS_SELECTOR, "p.pre-white-space").text
-                        rating_text = block.find_element(By.CSS_SELECTOR, "p.visually-hidden").text
-                        import re
-                        rating_match = re.search(r"Rated ([0-9.]+) out of 5", rating_text)
-                        rating = rating_match.group(1) if rating_match else "N/A"
-
-                        all_reviews.append({
-                            "title": title,
-                            "body": body,
-                            "rating": rating
-                        })
-
-                    except Exception:
-                        continue
+                        page_reviews = self.snapshot_review_page()
+                    except Exception as e:
+                        logging.warning(f"⚠️ Review snapshot failed, falling back to per-element scraping: {e}")
+
+                if page_reviews is None:
+                    page_reviews = self.read_review_page()
+                self.save_snapshot("reviews", page=page, partial=stop_early)
+                page += 1
+
+                if known is not None:
+                    fresh = known.new_reviews(page_reviews)
+                    all_reviews.extend(fresh)
+                    if stop_early and not fresh:
+                        logging.info("⏹️ Review page holds only known reviews; stopping pagination.")
+                        break
+                else:
+                    all_reviews.extend(page_reviews)
 
                 # ✅ Step 4: Handle pagination using new selector
                 try:
@@ -152,9 +319,13 @@ class ProductDetailScraper:
 
                     # Only proceed if button is not disabled
                     if next_link.get_attribute("aria-disabled") == "false":
+                        first_text = first_item.text
+                        throttle(self.driver.current_url)
                         self.driver.execute_script("arguments[0].click();", next_link)
                         logging.info("➡️ Clicked next review page.")
-                        time.sleep(2)
+                        first_item = wait_for_replacement(
+                            self.driver, REVIEW_ITEM, first_item, old_text=first_text, budget=self.budget
+                        )
                     else:
                         logging.info("❌ No more review pages (Next is disabled).")
                         break
@@ -167,4 +338,105 @@ class ProductDetailScraper:
 
         return all_reviews
 
+    def save_snapshot(self, kind, page=0, partial=False):
+        """
+        Saves the current page HTML under the product URL, if a snapshot store is configured.
+        """
+        if not self.snapshots or not self.url:
+            return
+        try:
+            self.snapshots.put(self.url, kind, self.driver.page_source, page=page, partial=partial)
+        except Exception as e:
+            logging.warning(f"⚠️ Could not save {kind} snapshot for {self.url}: {e}")
+
+    def sort_reviews_newest_first(self):
+        """
+        Reloads the review list with the newest-first sort if it is not already
+        applied. Returns True only if the page then shows newest-first order.
+        """
+        parts = urlparse(self.driver.current_url)
+        params = dict(parse_qsl(parts.query))
+        key, value = NEWEST_FIRST_SORT
+        if params.get(key) != value:
+            params[key] = value
+            sorted_url = urlunparse(parts._replace(query=urlencode(params)))
+            throttle(sorted_url)
+            self.driver.get(sorted_url)
+            wait_for_page_ready(self.driver, budget=self.budget)
+
+        if not wait_for_element(self.driver, REVIEW_ITEM, budget=self.budget):
+            return False
+        try:
+            confirmed = newest_first_confirmed(self.driver.execute_script(REVIEW_ORDER_JS) or {})
+        except Exception as e:
+            logging.warning(f"⚠️ Could not read the review order: {e}")
+            return False
+        if confirmed:
+            logging.info("↕️ Sorted reviews newest first.")
+        return confirmed
+
+    def snapshot_specifications(self):
+        """
+        Returns the spec sheet as a dict from one script round trip.
+        """
+        pairs = self.driver.execute_script(SPEC_SNAPSHOT_JS)
+        if not isinstance(pairs, list):
+            raise ValueError(f"Unexpected spec snapshot result: {type(pairs).__name__}")
+        return {label: value for label, value in pairs if label and value}
+
+    def read_specifications(self):
+        """
+        Per-element fallback for `snapshot_specifications`.
+        """
+        spec_blocks = self.driver.find_elements(*SPEC_BLOCK)
+
+        specs = {}
+        for block in spec_blocks:
+            try:
+                label_elem = block.find_element(By.CSS_SELECTOR, "div.font-weight-medium")
+                value_elem = block.find_element(By.CSS_SELECTOR, "div.pl-300")
+
+                label = label_elem.text.strip()
+                value = value_elem.text.strip()
+
+                if label and value:
+                    specs[label] = value
+            except Exception:
+                continue  # skip malformed entries
+
+        return specs
 
+    def snapshot_review_page(self):
+        """
+        Returns the reviews on the current page from one script round trip.
+        """
+        raw_reviews = self.driver.execute_script(REVIEW_SNAPSHOT_JS)
+        if not isinstance(raw_reviews, list):
+            raise ValueError(f"Unexpected review snapshot result: {type(raw_reviews).__name__}")
+        return [self.build_review(raw) for raw in raw_reviews if raw]
+
+    def read_review_page(self):
+        """
+        Per-element fallback for `snapshot_review_page`.
+        """
+        reviews = []
+        for block in self.driver.find_elements(*REVIEW_ITEM):
+            try:
+                reviews.append(self.build_review({
+                    "title": block.find_element(By.CSS_SELECTOR, "h4.review-title").text,
+                    "body": block.find_element(By.CSS_SELECTOR, "p.pre-white-space").text,
+                    "rating_text": block.find_element(By.CSS_SELECTOR, "p.visually-hidden").text
+                }))
+            except Exception:
+                continue
+
+        return reviews
+
+    @staticmethod
+    def build_review(raw):
+        rating_match = REVIEW_RATING_PATTERN.search(raw.get("rating_text") or "")
+        return {
+            "title": raw.get("title"),
+            "body": raw.get("body"),
+            "rating": rating_match.group(1) if rating_match else "N/A"
+        }
@@ -0,0 +1,39 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium.webdriver.common.by import By
+
+from utils.wait_utils import wait_for_element
+
+REVIEW_BUTTON = (By.CSS_SELECTOR, "button.see-all-reviews")
+NO_REVIEWS = (By.CSS_SELECTOR, ".no-reviews")
+
+
+class StubDriver:
+    """Answers find_elements from a {locator: [elements]} dict."""
+
+    def __init__(self, elements):
+        self.elements = elements
+
+    def find_elements(self, by, value):
+        return self.elements.get((by, value), [])
+
+
+def test_returns_element_when_present():
+    driver = StubDriver({REVIEW_BUTTON: ["button"]})
+    assert wait_for_element(driver, REVIEW_BUTTON, timeout=5, absent_locators=[NO_REVIEWS]) == "button"
+
+
+def test_absent_marker_short_circuits_the_wait():
+    driver = StubDriver({NO_REVIEWS: ["marker"]})
+    started = time.monotonic()
+    assert wait_for_element(driver, REVIEW_BUTTON, timeout=5, absent_locators=[NO_REVIEWS]) is None
+    assert time.monotonic() - started < 1
+
+
+def test_times_out_without_element_or_marker():
+    driver = StubDriver({})
+    assert wait_for_element(driver, REVIEW_BUTTON, timeout=0.3, absent_locators=[NO_REVIEWS]) is None
@@ -0,0 +1,88 @@
+# utils/category_registry.py
+
+import json
+import logging
+import threading
+from urllib.parse import quote_plus
+from config import BASE_URL, CATEGORIES_PATH, MAX_LISTING_PAGES
+
+_default = None
+_default_lock = threading.Lock()
+
+def build_search_url(category_id, search_term=None, facets=None, base_url=BASE_URL):
+    """
+    Builds a BestBuy search URL for a category with facet filters applied, e.g.
+    {"brand_facet": ["Brand~HP", "Brand~Dell"]} -> qp=brand_facet=Brand~HP^brand_facet=Brand~Dell.
+    """
+    qp = "^".join(
+        f"{facet}={value}"
+        for facet, values in (facets or {}).items()
+        for value in ([values] if isinstance(values, str) else values)
+    )
+    params = [f"id={quote_plus(category_id)}"]
+    if qp:
+        params.append("qp=" + quote_plus(qp).replace("~", "%7E"))
+    if search_term:
+        params.append(f"st={quote_plus(search_term)}")
+    params.append("intl=nosplash")
+    return f"{base_url.rstrip('/')}/site/searchpage.jsp?" + "&".join(params)
+
+class Category:
+    """
+    One crawlable listing: a category id with its facet filters.
+    """
+
+    def __init__(self, name, category_id, search_term=None, facets=None, max_pages=None, url=None):
+        self.name = name
+        self.category_id = category_id
+        self.search_term = search_term
+        self.facets = facets or {}
+        self.max_pages = int(max_pages or MAX_LISTING_PAGES)
+        self.url = url or build_search_url(category_id, search_term, self.facets)
+
+    def __repr__(self):
+        return f"Category({self.name!r})"
+
+def load_categories(path=CATEGORIES_PATH, names=None):
+    """
+    Loads the category registry, a JSON object of
+    {name: {"category_id", "search_term"?, "facets"?, "max_pages"?, "url"?, "enabled"?}}.
+    With `names`, returns those categories in that order; otherwise every enabled one.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        registry = json.load(f)
+
+    if names:
+        unknown = [name for name in names if name not in registry]
+        if unknown:
+            raise ValueError(f"Unknown categories {unknown}; registry {path} has {sorted(registry)}")
+        selected = [(name, registry[name]) for name in names]
+    else:
+        selected = [(name, entry) for name, entry in registry.items() if entry.get("enabled", True)]
+
+    categories = [
+        Category(
+            name,
+            entry["category_id"],
+            search_term=entry.get("search_term"),
+            facets=entry.get("facets"),
+            max_pages=entry.get("max_pages"),
+            url=entry.get("url"),
+        )
+        for name, entry in selected
+    ]
+    logging.info(f"🗂️ Loaded {len(categories)} categories from {path}: {[c.name for c in categories]}")
+    return categories
+
+def default_category():
+    """
+    The first enabled category in the registry (read once, then reused).
+    """
+    global _default
+    with _default_lock:
+        if _default is None:
+            categories = load_categories()
+            if not categories:
+                raise ValueError(f"No enabled categories in {CATEGORIES_PATH}")
+            _default = categories[0]
+        return _default
@@ -4,11 +4,20 @@ import time
 import random
 import logging
 from config import WAIT_MIN, WAIT_MAX
+from utils.rate_limiter import RATE_LIMITER
 
 def apply_random_delay():
     """
     Applies a random delay between requests to mimic human behavior.
+    Blocks the calling thread for the whole delay; scrapers use `throttle` instead.
     """
     delay = random.uniform(WAIT_MIN, WAIT_MAX)
     logging.info(f"Applying random delay: {delay:.2f} seconds")
     time.sleep(delay)
+
+def throttle(url):
+    """
+    Waits for a request slot for `url`'s host from the shared token-bucket limiter.
+    Only the calling thread waits, and only as long as the global budget requires.
+    """
+    return RATE_LIMITER.acquire(url)
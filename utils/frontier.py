@@ -0,0 +1,162 @@
+# utils/frontier.py
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    key         TEXT PRIMARY KEY,
+    url         TEXT,
+    path        TEXT,
+    priority    INTEGER NOT NULL DEFAULT 0,
+    status      TEXT NOT NULL DEFAULT 'queued',
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_until REAL,
+    enqueued_at REAL,
+    updated_at  REAL,
+    last_error  TEXT
+);
+CREATE INDEX IF NOT EXISTS frontier_ready ON frontier (status, priority DESC, enqueued_at);
+"""
+
+class Frontier:
+    """
+    Persistent SQLite (WAL) queue of product detail pages to visit.
+
+    Items are keyed by product key, so pushing a product that is already queued
+    or leased only raises its priority. `lease()` hands the highest-priority
+    item to one worker for `lease_seconds`; an item whose lease runs out (its
+    worker died) becomes available again. `fail()` re-queues an item until it has
+    been tried `max_attempts` times. Status is one of "queued", "leased", "done"
+    or "failed".
+    """
+
+    def __init__(self, path, lease_seconds=1200, max_attempts=3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def push(self, key, url, path=None, priority=0):
+        """
+        Queues a product (again, if it was done or failed). Returns True if the
+        item was not already waiting or in progress.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT status FROM frontier WHERE key = ?", (key,)).fetchone()
+            if row and row[0] in ("queued", "leased"):
+                self._conn.execute(
+                    "UPDATE frontier SET priority = MAX(priority, ?), url = COALESCE(?, url), path = ? WHERE key = ?",
+                    (priority, url, path, key),
+                )
+                return False
+            self._conn.execute(
+                """
+                INSERT INTO frontier (key, url, path, priority, status, attempts, enqueued_at, updated_at)
+                VALUES (?, ?, ?, ?, 'queued', 0, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    url = COALESCE(excluded.url, url), path = excluded.path, priority = excluded.priority,
+                    status = 'queued', attempts = 0, lease_owner = NULL, lease_until = NULL,
+                    enqueued_at = excluded.enqueued_at, updated_at = excluded.updated_at, last_error = NULL
+                """,
+                (key, url, path, priority, now, now),
+            )
+            return True
+
+    def lease(self, owner):
+        """
+        Claims the next item for `owner`. Returns (key, url, path) or None if nothing is ready.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    """
+                    SELECT key, url, path FROM frontier
+                    WHERE status = 'queued' OR (status = 'leased' AND lease_until < ?)
+                    ORDER BY priority DESC, enqueued_at
+                    LIMIT 1
+                    """,
+                    (now,),
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        """
+                        UPDATE frontier SET status = 'leased', lease_owner = ?, lease_until = ?,
+                            attempts = attempts + 1, updated_at = ?
+                        WHERE key = ?
+                        """,
+                        (owner, now + self.lease_seconds, now, row[0]),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return tuple(row) if row else None
+
+    def complete(self, key):
+        self._set_status(key, "done")
+
+    def fail(self, key, error=None):
+        """
+        Re-queues a failed item, or marks it "failed" once it used up its attempts.
+        Returns True if it will be retried.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT attempts FROM frontier WHERE key = ?", (key,)).fetchone()
+        retry = row is not None and row[0] < self.max_attempts
+        self._set_status(key, "queued" if retry else "failed", error)
+        if not retry:
+            logging.warning(f"⚠️ Giving up on {key} after {self.max_attempts} attempts.")
+        return retry
+
+    def requeue_leased(self):
+        """
+        Returns every leased item to the queue (e.g. leases left by a crashed run).
+        """
+        with self._lock:
+            count = self._conn.execute(
+                "UPDATE frontier SET status = 'queued', lease_owner = NULL, lease_until = NULL WHERE status = 'leased'"
+            ).rowcount
+        if count:
+            logging.info(f"↩️ Re-queued {count} leased frontier items from an earlier run.")
+        return count
+
+    def active(self):
+        """
+        Number of items queued or leased.
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM frontier WHERE status IN ('queued', 'leased')"
+            ).fetchone()[0]
+
+    def counts(self):
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM frontier GROUP BY status").fetchall())
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _set_status(self, key, status, error=None):
+        with self._lock:
+            self._conn.execute(
+                """
+                UPDATE frontier SET status = ?, lease_owner = NULL, lease_until = NULL,
+                    updated_at = ?, last_error = ?
+                WHERE key = ?
+                """,
+                (status, time.time(), str(error)[:500] if error else None, key),
+            )
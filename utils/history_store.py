@@ -0,0 +1,139 @@
+# utils/history_store.py
+
+import os
+import math
+import time
+import struct
+import logging
+import threading
+from utils.url_utils import sku_from_url
+
+# One fixed-size little-endian record per observation:
+# sku (int64), unix time (int64), price (float64), rating (float32), review count (int32).
+RECORD = struct.Struct("<qqdfi")
+NUMPY_DTYPE = [("sku", "<i8"), ("ts", "<i8"), ("price", "<f8"), ("rating", "<f4"), ("review_count", "<i4")]
+
+def _to_float(value):
+    try:
+        return float(str(value).replace("$", "").replace(",", ""))
+    except (TypeError, ValueError):
+        return math.nan
+
+def _to_int(value):
+    try:
+        return int(str(value).strip("()").replace(",", ""))
+    except (TypeError, ValueError):
+        return -1
+
+class PriceHistory:
+    """
+    Append-only (SKU, timestamp, price, rating, review_count) observations.
+
+    Records are 32-byte fixed-size rows appended to one binary file, so a crawl
+    costs a single append and the whole history loads as a NumPy structured
+    array (memory-mapped) for vectorised queries. Missing prices/ratings are
+    stored as NaN and missing review counts as -1.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, products, ts=None):
+        """
+        Records one observation per product with a SKU. Returns the number written.
+        """
+        ts = int(ts if ts is not None else time.time())
+        payload = bytearray()
+        for product in products:
+            sku = sku_from_url(product.get("product_url"))
+            if not sku:
+                continue
+            payload += RECORD.pack(
+                int(sku), ts,
+                _to_float(product.get("price")),
+                _to_float(product.get("rating")),
+                _to_int(product.get("reviews")),
+            )
+
+        if not payload:
+            return 0
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "ab") as f:
+                f.write(payload)
+        count = len(payload) // RECORD.size
+        logging.info(f"📈 Recorded {count} price/rating observations in {self.path}.")
+        return count
+
+    def load(self):
+        """
+        Returns every observation as a NumPy structured array (empty if none).
+        """
+        import numpy as np
+
+        dtype = np.dtype(NUMPY_DTYPE)
+        if not os.path.exists(self.path):
+            return np.empty(0, dtype=dtype)
+        # Ignore a trailing partial record left by an interrupted append.
+        count = os.path.getsize(self.path) // dtype.itemsize
+        if count == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self.path, dtype=dtype, mode="r", shape=(count,))
+
+    def to_frame(self):
+        """
+        Observations as a DataFrame sorted by SKU and time, with `ts` as datetimes.
+        """
+        import numpy as np
+        import pandas as pd
+
+        obs = self.load()
+        order = np.lexsort((obs["ts"], obs["sku"]))
+        df = pd.DataFrame({name: np.asarray(obs[name])[order] for name, _ in NUMPY_DTYPE})
+        df["review_count"] = df["review_count"].where(df["review_count"] >= 0)
+        df["ts"] = pd.to_datetime(df["ts"], unit="s", utc=True)
+        return df
+
+    def latest(self):
+        """
+        Most recent observation per SKU.
+        """
+        df = self.to_frame()
+        return df.groupby("sku", sort=False).tail(1).reset_index(drop=True)
+
+    def deltas(self):
+        """
+        Latest observation per SKU next to the previous one, with the changes between them.
+        """
+        df = self.to_frame()
+        previous = df.groupby("sku", sort=False)[["price", "rating", "review_count", "ts"]].shift(1)
+        df = df.assign(
+            prev_price=previous["price"],
+            prev_rating=previous["rating"],
+            prev_review_count=previous["review_count"],
+            prev_ts=previous["ts"],
+        )
+        df["price_change"] = df["price"] - df["prev_price"]
+        df["price_change_pct"] = df["price_change"] / df["prev_price"] * 100
+        df["rating_change"] = df["rating"] - df["prev_rating"]
+        df["review_count_change"] = df["review_count"] - df["prev_review_count"]
+        return df.groupby("sku", sort=False).tail(1).reset_index(drop=True)
+
+    def window_stats(self, days=30, now=None):
+        """
+        Min/max price and rating per SKU over the last `days` days.
+        """
+        import pandas as pd
+
+        df = self.to_frame()
+        now = pd.Timestamp(now, tz="UTC") if now is not None else pd.Timestamp.now(tz="UTC")
+        window = df[df["ts"] >= now - pd.Timedelta(days=days)]
+        stats = window.groupby("sku").agg(
+            min_price=("price", "min"),
+            max_price=("price", "max"),
+            min_rating=("rating", "min"),
+            max_rating=("rating", "max"),
+            observations=("ts", "size"),
+        )
+        return stats.reset_index()
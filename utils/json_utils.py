@@ -1,33 +1,250 @@
 # utils/json_utils.py
 
 import os
+import re
 import json
+import atexit
 import logging
+import tempfile
+import threading
+from utils.url_utils import product_key
 
-def save_product_json(product_data, output_dir="data/raw"):
+# Formats used by the original synchronous writers: listings were pretty-printed
+# with indent=4, detail updates with indent=2.
+LISTING_FORMAT = {"ensure_ascii": False, "indent": 4}
+UPDATE_FORMAT = {"ensure_ascii": True, "indent": 2}
+
+_writer = None
+
+def legacy_json_path(product_data, output_dir="data/raw"):
+    # Clean filename using product name (the layout before files carried the SKU)
+    safe_name = product_data.get("name", "product").replace("/", "-").replace("\\", "-").replace(" ", "_")
+    filename = f"{safe_name[:50]}.json"  # Limit to 50 chars to avoid issues
+    return os.path.join(output_dir, filename)
+
+def product_json_path(product_data, output_dir="data/raw"):
+    """
+    data/raw/<name>_<sku>.json: the cleaned name, plus the product key (SKU) so
+    products whose names clean to the same string get separate files.
+    """
+    stem, ext = os.path.splitext(legacy_json_path(product_data, output_dir))
+    key = re.sub(r"[^\w.-]", "-", str(product_key(product_data)))[-40:]
+    return f"{stem}_{key}{ext}"
+
+def migrate_legacy_json(product_data, output_dir="data/raw"):
+    """
+    Moves the product's name-only file (from before files carried the SKU) to
+    its SKU-named path, or removes it if that path already exists, so the
+    product is not read twice. A name-only file holding another product is kept.
+    """
+    legacy_path = legacy_json_path(product_data, output_dir)
+    if not os.path.exists(legacy_path):
+        return
     try:
-        # Clean filename using product name or unique ID
-        safe_name = product_data.get("name", "product").replace("/", "-").replace("\\", "-").replace(" ", "_")
-        filename = f"{safe_name[:50]}.json"  # Limit to 50 chars to avoid issues
-        filepath = os.path.join(output_dir, filename)
+        if product_key(_read_json(legacy_path)) != product_key(product_data):
+            return
+        filepath = product_json_path(product_data, output_dir)
+        if os.path.exists(filepath):
+            os.remove(legacy_path)
+        else:
+            os.replace(legacy_path, filepath)
+        logging.info(f"🚚 Replaced {legacy_path} with {filepath}")
+    except Exception as e:
+        logging.warning(f"⚠️ Could not migrate {legacy_path}: {e}")
+
+def atomic_write_json(filepath, data, **dump_kwargs):
+    """
+    Writes JSON to a temp file in the same directory, fsyncs it and renames it over
+    `filepath`, so readers see either the old or the new file, never a partial one.
+    """
+    directory = os.path.dirname(filepath) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, **dump_kwargs)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def _merge_into_file(filepath, new_data, dump_kwargs):
+    data = {}
+    if os.path.exists(filepath):
+        try:
+            data = _read_json(filepath)
+        except Exception as e:
+            logging.warning(f"⚠️ Could not merge existing {filepath}, overwriting: {e}")
+    data.update(new_data)
+    atomic_write_json(filepath, data, **dump_kwargs)
+
+
+class JsonWriteBehind:
+    """
+    Background writer for product JSON files.
+
+    `enqueue(path, data)` returns immediately; the writer thread merges `data`
+    into the file (like `dict.update`) with an atomic write. Several updates to
+    the same file queued before the writer gets to it are coalesced into one
+    read-merge-write. `flush()` waits for everything queued before the call
+    (not for later updates) and returns the writes that failed since the last
+    flush; `close()` flushes and stops the
+    thread (also run at interpreter exit).
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._inflight = {}
+        self._failed = {}
+        # Updates enqueued so far, and how many of them are on disk
+        self._queued = 0
+        self._written = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="json-write-behind", daemon=True)
+        self._thread.start()
+
+    def enqueue(self, filepath, data, dump_kwargs):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("JsonWriteBehind is closed.")
+            merged, _ = self._pending.get(filepath, ({}, None))
+            merged.update(data)
+            self._pending[filepath] = (merged, dump_kwargs)
+            self._queued += 1
+            self._cond.notify_all()
+
+    def pending_for(self, filepath):
+        """
+        Returns the not-yet-written updates for `filepath` (oldest first), merged.
+        """
+        with self._cond:
+            merged = {}
+            for source in (self._inflight, self._pending):
+                if filepath in source:
+                    merged.update(source[filepath][0])
+            return merged
+
+    def flush(self):
+        """
+        Waits until every update queued before this call is on disk. Returns
+        {filepath: error} of the writes that failed since the previous flush.
+        """
+        with self._cond:
+            target = self._queued
+            self._cond.wait_for(lambda: self._written >= target)
+            failed, self._failed = self._failed, {}
+            return failed
 
-        # Create dir if it doesn't exist
-        os.makedirs(output_dir, exist_ok=True)
+    def close(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
 
-        # Save JSON
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(product_data, f, ensure_ascii=False, indent=4)
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending and self._closed:
+                    return
+                self._inflight, self._pending = self._pending, {}
+                batch = dict(self._inflight)
+                batch_queued = self._queued
 
-        logging.info(f"📝 Saved product JSON: {filepath}")
+            failed = {}
+            for filepath, (data, dump_kwargs) in batch.items():
+                try:
+                    _merge_into_file(filepath, data, dump_kwargs)
+                    logging.info(f"📝 Wrote product JSON: {filepath}")
+                except Exception as e:
+                    logging.error(f"❌ Error writing product JSON {filepath}: {e}")
+                    failed[filepath] = e
+
+            with self._cond:
+                for filepath in batch:
+                    self._failed.pop(filepath, None)
+                self._failed.update(failed)
+                self._inflight = {}
+                self._written = batch_queued
+                self._cond.notify_all()
+
+
+def enable_write_behind():
+    """
+    Routes save_product_json/update_product_json through a background writer.
+    """
+    global _writer
+    if _writer is None:
+        _writer = JsonWriteBehind()
+        atexit.register(disable_write_behind)
+    return _writer
+
+def disable_write_behind():
+    """
+    Flushes and stops the background writer; later writes are synchronous again.
+    """
+    global _writer
+    if _writer is not None:
+        writer, _writer = _writer, None
+        writer.close()
+
+def flush_write_behind():
+    """
+    Waits for the background writer (if enabled) to write everything queued so
+    far. Returns {filepath: error} of the queued writes that failed.
+    """
+    return _writer.flush() if _writer is not None else {}
+
+def _write(filepath, data, dump_kwargs):
+    if _writer is not None:
+        _writer.enqueue(filepath, data, dump_kwargs)
+    else:
+        _merge_into_file(filepath, data, dump_kwargs)
+
+def save_product_json(product_data, output_dir="data/raw"):
+    """
+    Writes listing data to data/raw/<name>_<sku>.json and returns the path (None on error).
+    Detail fields from an earlier crawl (full_specs, all_reviews) are kept, also
+    when they are still in the product's name-only file.
+    """
+    try:
+        filepath = product_json_path(product_data, output_dir)
+        migrate_legacy_json(product_data, output_dir)
+
+        # Keep previously scraped details so unchanged products need no re-visit
+        _write(filepath, product_data, LISTING_FORMAT)
+
+        logging.info(f"📝 {'Queued' if _writer is not None else 'Saved'} product JSON: {filepath}")
+        return filepath
     except Exception as e:
         logging.error(f"❌ Error saving product JSON: {e}")
-        
-def load_product_json(filepath):
+        return None
+
+def _read_json(filepath):
     with open(filepath, "r", encoding="utf-8") as f:
         return json.load(f)
 
+def load_product_json(filepath):
+    """
+    Loads a product JSON, including updates still queued in the background writer.
+    """
+    pending = _writer.pending_for(filepath) if _writer is not None else {}
+    try:
+        data = _read_json(filepath)
+    except FileNotFoundError:
+        if not pending:
+            raise
+        data = {}
+    data.update(pending)
+    return data
+
 def update_product_json(filepath, new_data: dict):
-    data = load_product_json(filepath)
-    data.update(new_data)
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    _write(filepath, new_data, UPDATE_FORMAT)
@@ -0,0 +1,230 @@
+# utils/manifest_utils.py
+
+import os
+import json
+import time
+import uuid
+import hashlib
+import logging
+import threading
+from datetime import datetime, timezone
+from config import MANIFEST_SAVE_EVERY, MANIFEST_SAVE_INTERVAL
+from utils.json_utils import flush_write_behind
+from utils.url_utils import product_key
+
+LISTING_HASH_FIELDS = ("price", "rating", "reviews")
+
+def listing_hash(product):
+    """
+    Hash of the listing fields whose change means the detail page is worth re-visiting.
+    """
+    payload = json.dumps([product.get(field) for field in LISTING_HASH_FIELDS], ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+def _record_write_failures(data, failed):
+    # Products whose queued JSON write failed ({path: error}) get failed stages; returns their keys
+    keys = []
+    for key, entry in data["products"].items():
+        error = failed.get(entry.get("path"))
+        if error is not None:
+            for stage in ("listing", "specs", "reviews"):
+                RunManifest._set_stage(entry, stage, "failed", error)
+            keys.append(key)
+    return keys
+
+class RunManifest:
+    """
+    Tracks per-product crawl progress across runs in a single JSON file.
+
+    Layout:
+        {
+          "run": {"id", "started_at", "listing_complete", "finished_at"},
+          "products": {
+            <sku>: {
+              "name", "path", "listing_hash", "last_seen_run",
+              "stages": {<stage>: {"status", "at", "epoch", "error"?}}
+            }
+          },
+          "categories": {<name>: {"listed_at", "epoch", "pages", "products"}}
+        }
+
+    Stage status is one of "pending", "done", "empty" (scraped but nothing found)
+    or "failed". The file is rewritten atomically, so a crash mid-save leaves the
+    previous version intact. Per-product updates are batched: `save()` only
+    writes once `save_every` updates or `save_interval` seconds have accumulated
+    since the last write, while run milestones and `save(force=True)` always
+    write, so an interrupted run loses at most that much progress. Product
+    JSON writes queued in the background writer before a snapshot is taken are
+    flushed (outside the manifest lock) before it is written, so a stage is
+    only saved as done once its file is written; products whose queued write
+    failed are saved as failed instead.
+    """
+
+    def __init__(self, path, save_every=MANIFEST_SAVE_EVERY, save_interval=MANIFEST_SAVE_INTERVAL):
+        self.path = path
+        self.save_every = save_every
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._unsaved = 0
+        self._saved_at = time.monotonic()
+        self.data = {"run": {}, "products": {}}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.data = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning(f"⚠️ Could not read manifest {path}, starting fresh: {e}")
+        self.data.setdefault("run", {})
+        self.data.setdefault("products", {})
+        self.data.setdefault("categories", {})
+
+    @property
+    def run(self):
+        return self.data["run"]
+
+    def start_run(self):
+        """
+        Begins a new run; products not re-listed in it are ignored by `detail_queue`.
+        """
+        with self._lock:
+            self.data["run"] = {
+                "id": uuid.uuid4().hex[:12],
+                "started_at": _now(),
+                "listing_complete": False,
+            }
+        self.save(force=True)
+        logging.info(f"🗂️ Started run {self.run['id']}.")
+
+    def can_resume(self):
+        """
+        True if the previous run finished listing but not the detail stages.
+        """
+        return bool(self.run.get("listing_complete")) and not self.run.get("finished_at")
+
+    def record_listing(self, product, path):
+        """
+        Records a product seen on the listing page. Returns True if it is new or
+        its price/rating/review count changed, in which case its detail stages are
+        reset to "pending".
+        """
+        key = product_key(product)
+        new_hash = listing_hash(product)
+        with self._lock:
+            entry = self.data["products"].setdefault(key, {"stages": {}})
+            changed = entry.get("listing_hash") != new_hash
+            entry.update({
+                "name": product.get("name"),
+                "path": path,
+                "listing_hash": new_hash,
+                "last_seen_run": self.run.get("id"),
+            })
+            self._set_stage(entry, "listing", "done")
+            self._unsaved += 1
+            if changed:
+                for stage in ("specs", "reviews"):
+                    self._set_stage(entry, stage, "pending")
+        return changed
+
+    def record_category(self, name, pages, products):
+        """
+        Records a finished category listing (used to schedule the next crawl).
+        """
+        with self._lock:
+            self.data["categories"][name] = {
+                "listed_at": _now(),
+                "epoch": time.time(),
+                "pages": pages,
+                "products": products,
+            }
+            self._unsaved += 1
+
+    def category_state(self, name):
+        return self.data["categories"].get(name, {})
+
+    def finish_listing(self):
+        with self._lock:
+            self.run["listing_complete"] = True
+        self.save(force=True)
+
+    def finish_run(self):
+        with self._lock:
+            self.run["finished_at"] = _now()
+        self.save(force=True)
+
+    def mark_stage(self, key, stage, status, error=None):
+        with self._lock:
+            entry = self.data["products"].setdefault(key, {"stages": {}})
+            self._set_stage(entry, stage, status, error)
+            self._unsaved += 1
+
+    def needs_detail(self, key, max_age):
+        """
+        True unless both detail stages are done (or empty) and younger than `max_age` seconds.
+        """
+        stages = self.data["products"].get(key, {}).get("stages", {})
+        for stage in ("specs", "reviews"):
+            info = stages.get(stage, {})
+            if info.get("status") not in ("done", "empty"):
+                return True
+            if time.time() - info.get("epoch", 0) > max_age:
+                return True
+        return False
+
+    def detail_queue(self, max_age):
+        """
+        Returns [(key, path)] of products listed in the current run that need detail
+        scraping. `path` is None for products kept in the SQLite store.
+        """
+        run_id = self.run.get("id")
+        return [
+            (key, entry.get("path"))
+            for key, entry in self.data["products"].items()
+            if entry.get("last_seen_run") == run_id
+            and self.needs_detail(key, max_age)
+        ]
+
+    def save(self, force=False):
+        """
+        Writes the manifest if `force`d or enough updates/time have accumulated
+        since the last write. Returns True if it was written.
+        """
+        # _save_lock first, so snapshots reach the disk in the order they were taken
+        with self._save_lock:
+            with self._lock:
+                due = (self._unsaved >= self.save_every
+                       or time.monotonic() - self._saved_at >= self.save_interval)
+                if not (force or due):
+                    return False
+                payload = json.dumps(self.data, ensure_ascii=False, indent=2)
+                self._unsaved = 0
+                self._saved_at = time.monotonic()
+
+            # Every stage in the snapshot was marked after its JSON write was queued,
+            # so once the writes queued so far are flushed, its "done" stages are on disk.
+            # Scrapers keep updating the manifest meanwhile.
+            failed = flush_write_behind()
+            if failed:
+                with self._lock:
+                    keys = _record_write_failures(self.data, failed)
+                logging.error(f"❌ Product JSON not written for {len(keys)} product(s) {keys[:10]}; marked them failed.")
+                snapshot = json.loads(payload)
+                _record_write_failures(snapshot, failed)
+                payload = json.dumps(snapshot, ensure_ascii=False, indent=2)
+
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+        return True
+
+    @staticmethod
+    def _set_stage(entry, stage, status, error=None):
+        info = {"status": status, "at": _now(), "epoch": time.time()}
+        if error:
+            info["error"] = str(error)[:500]
+        entry.setdefault("stages", {})[stage] = info
@@ -0,0 +1,170 @@
+# utils/product_store.py
+
+import os
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timezone
+from utils.json_utils import LISTING_FORMAT, atomic_write_json, migrate_legacy_json, product_json_path
+from utils.url_utils import product_key
+
+LISTING_FIELDS = ("name", "price", "rating", "reviews", "specs", "product_url")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    sku         TEXT PRIMARY KEY,
+    name        TEXT,
+    price       TEXT,
+    rating      TEXT,
+    reviews     TEXT,
+    specs       TEXT,
+    product_url TEXT,
+    has_specs   INTEGER NOT NULL DEFAULT 0,
+    listed_at   TEXT,
+    detailed_at TEXT
+);
+CREATE TABLE IF NOT EXISTS specs (
+    sku   TEXT NOT NULL REFERENCES products(sku) ON DELETE CASCADE,
+    label TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (sku, label)
+);
+CREATE TABLE IF NOT EXISTS reviews (
+    sku      TEXT NOT NULL REFERENCES products(sku) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    title    TEXT,
+    body     TEXT,
+    rating   TEXT,
+    PRIMARY KEY (sku, position)
+);
+"""
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+class ProductStore:
+    """
+    SKU-keyed SQLite store (WAL mode) for listings, specs and reviews.
+
+    Products are keyed by `utils.url_utils.product_key` (the SKU from
+    `product_url`), so products with the same display name no longer overwrite
+    each other. Every public write is one transaction; `export_json` writes the
+    data/raw JSON layout the analysis pipeline reads.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+
+    def upsert_products(self, products):
+        """
+        Inserts or updates listing rows for many products in a single transaction.
+        Returns the keys in input order.
+        """
+        keys = [product_key(product) for product in products]
+        now = _now()
+        rows = [
+            (key, *[product.get(field) for field in LISTING_FIELDS], now)
+            for key, product in zip(keys, products)
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO products (sku, name, price, rating, reviews, specs, product_url, listed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(sku) DO UPDATE SET
+                    name = excluded.name, price = excluded.price, rating = excluded.rating,
+                    reviews = excluded.reviews, specs = excluded.specs,
+                    product_url = excluded.product_url, listed_at = excluded.listed_at
+                """,
+                rows,
+            )
+        logging.info(f"🗄️ Stored {len(rows)} product listings in {self.path}.")
+        return keys
+
+    def save_details(self, sku, full_specs, all_reviews):
+        """
+        Replaces a product's specs and reviews in one transaction.
+        """
+        specs = full_specs if isinstance(full_specs, dict) else {}
+        reviews = all_reviews if isinstance(all_reviews, list) else []
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM specs WHERE sku = ?", (sku,))
+            self._conn.execute("DELETE FROM reviews WHERE sku = ?", (sku,))
+            self._conn.executemany(
+                "INSERT INTO specs (sku, label, value) VALUES (?, ?, ?)",
+                [(sku, label, value) for label, value in specs.items()],
+            )
+            self._conn.executemany(
+                "INSERT INTO reviews (sku, position, title, body, rating) VALUES (?, ?, ?, ?, ?)",
+                [(sku, idx, r.get("title"), r.get("body"), r.get("rating")) for idx, r in enumerate(reviews)],
+            )
+            self._conn.execute(
+                "UPDATE products SET has_specs = ?, detailed_at = ? WHERE sku = ?",
+                (1 if specs else 0, _now(), sku),
+            )
+
+    def get_product(self, sku):
+        """
+        Returns one product in the data/raw JSON layout, or None.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM products WHERE sku = ?", (sku,)).fetchone()
+            if row is None:
+                return None
+            return self._assemble(row)
+
+    def iter_products(self):
+        """
+        Yields every product in the data/raw JSON layout.
+        """
+        with self._lock:
+            skus = [row["sku"] for row in self._conn.execute("SELECT sku FROM products ORDER BY sku")]
+        for sku in skus:
+            product = self.get_product(sku)
+            if product is not None:
+                yield product
+
+    def export_json(self, output_dir="data/raw"):
+        """
+        Writes every product as data/raw JSON under the same <name>_<sku>.json
+        path the JSON backend uses, replacing the product's name-only file if
+        one is left. Returns the number of files written.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        count = 0
+        for product in self.iter_products():
+            migrate_legacy_json(product, output_dir)
+            atomic_write_json(product_json_path(product, output_dir), product, **LISTING_FORMAT)
+            count += 1
+        logging.info(f"📤 Exported {count} products from {self.path} to {output_dir}.")
+        return count
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _assemble(self, row):
+        product = {field: row[field] for field in LISTING_FIELDS}
+        if row["detailed_at"] is None:
+            return product
+
+        specs = {
+            r["label"]: r["value"]
+            for r in self._conn.execute("SELECT label, value FROM specs WHERE sku = ? ORDER BY rowid", (row["sku"],))
+        }
+        product["full_specs"] = specs if row["has_specs"] else "N/A"
+        product["all_reviews"] = [
+            {"title": r["title"], "body": r["body"], "rating": r["rating"]}
+            for r in self._conn.execute(
+                "SELECT title, body, rating FROM reviews WHERE sku = ? ORDER BY position", (row["sku"],)
+            )
+        ]
+        return product
@@ -0,0 +1,67 @@
+# utils/rate_limiter.py
+
+import time
+import logging
+import threading
+from urllib.parse import urlparse
+from config import REQUEST_RATE, REQUEST_BURST
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, holding at most `capacity`.
+
+    `reserve()` takes a token immediately (going into debt if none is left) and
+    returns how long the caller must wait before using it, so waiting happens
+    outside the lock and concurrent callers are spaced out fairly.
+    """
+
+    def __init__(self, rate, capacity=1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = max(1, int(capacity))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class HostRateLimiter:
+    """
+    One TokenBucket per host, shared by every thread and browser session in the process.
+    """
+
+    def __init__(self, rate=REQUEST_RATE, burst=REQUEST_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url):
+        host = urlparse(url).netloc.lower() if url else ""
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return self._buckets[host]
+
+    def acquire(self, url):
+        wait = self.bucket(url).acquire()
+        if wait > 0:
+            logging.info(f"Rate limit: waited {wait:.2f}s for {urlparse(url).netloc or 'default host'}")
+        return wait
+
+
+RATE_LIMITER = HostRateLimiter()
@@ -0,0 +1,45 @@
+# utils/review_index.py
+
+import hashlib
+
+def review_fingerprint(review):
+    """
+    Stable hash of a review's title, body and rating (whitespace-normalised).
+    """
+    parts = [" ".join(str(review.get(field) or "").split()) for field in ("title", "body", "rating")]
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+class ReviewIndex:
+    """
+    Fingerprints of a product's already-stored reviews, used to stop review
+    pagination once a page holds nothing new.
+    """
+
+    def __init__(self, reviews=None):
+        self.reviews = list(reviews) if isinstance(reviews, list) else []
+        self._fingerprints = {review_fingerprint(r) for r in self.reviews}
+
+    def __len__(self):
+        return len(self._fingerprints)
+
+    def __contains__(self, review):
+        return review_fingerprint(review) in self._fingerprints
+
+    def new_reviews(self, reviews):
+        """
+        Returns the reviews not in the index (also de-duplicating within `reviews`)
+        and adds them to it.
+        """
+        fresh = []
+        for review in reviews:
+            fingerprint = review_fingerprint(review)
+            if fingerprint not in self._fingerprints:
+                self._fingerprints.add(fingerprint)
+                fresh.append(review)
+        return fresh
+
+    def merge(self, new_reviews):
+        """
+        Stored reviews with `new_reviews` (newest first) prepended.
+        """
+        return list(new_reviews) + self.reviews
@@ -0,0 +1,138 @@
+# utils/snapshot_store.py
+
+import os
+import gzip
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+from datetime import datetime, timezone
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    url         TEXT NOT NULL,
+    kind        TEXT NOT NULL,
+    page        INTEGER NOT NULL,
+    sha         TEXT NOT NULL,
+    partial     INTEGER NOT NULL DEFAULT 0,
+    captured_at TEXT,
+    PRIMARY KEY (url, kind, page)
+);
+"""
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+def object_path(root, sha):
+    return os.path.join(root, "objects", sha[:2], f"{sha[2:]}.html.gz")
+
+def read_snapshot(root, sha):
+    """
+    Returns the HTML stored under `sha`. A plain function so worker processes can
+    read snapshots without opening the index.
+    """
+    with gzip.open(object_path(root, sha), "rb") as f:
+        return f.read().decode("utf-8")
+
+def parse_html(html):
+    """
+    Parses snapshot HTML for the offline extractors (needs beautifulsoup4).
+    """
+    try:
+        from bs4 import BeautifulSoup
+    except ImportError as e:
+        raise ImportError("Replaying snapshots needs beautifulsoup4: pip install beautifulsoup4") from e
+    return BeautifulSoup(html, "html.parser")
+
+class SnapshotStore:
+    """
+    Content-addressed store of gzip-compressed page HTML.
+
+    Each page is saved once under the SHA-256 of its HTML in
+    <root>/objects/<2 hex>/<rest>.html.gz, so identical pages across crawls share
+    one file. A SQLite index at <root>/index.db maps (url, kind, page) to the
+    latest snapshot, where kind is "listing", "detail" or "reviews" (one row per
+    review page). `partial` marks review pages captured by an incremental crawl,
+    which only holds the newest reviews.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, "index.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def put(self, url, kind, html, page=0, partial=False):
+        """
+        Stores `html` (if not already stored) and points (url, kind, page) at it.
+        Returns the content hash.
+        """
+        data = html.encode("utf-8")
+        sha = hashlib.sha256(data).hexdigest()
+        path = object_path(self.root, sha)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(path))
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(gzip.compress(data, mtime=0))
+                os.replace(tmp_path, path)
+            except BaseException:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO snapshots (url, kind, page, sha, partial, captured_at) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url, kind, page) DO UPDATE SET
+                    sha = excluded.sha, partial = excluded.partial, captured_at = excluded.captured_at
+                """,
+                (url, kind, page, sha, 1 if partial else 0, _now()),
+            )
+        logging.info(f"📸 Saved {kind} snapshot {sha[:12]} for {url}")
+        return sha
+
+    def clear(self, url, kind=None):
+        """
+        Forgets the snapshots indexed for `url` (optionally one kind). Objects stay on disk.
+        """
+        with self._lock, self._conn:
+            if kind is None:
+                self._conn.execute("DELETE FROM snapshots WHERE url = ?", (url,))
+            else:
+                self._conn.execute("DELETE FROM snapshots WHERE url = ? AND kind = ?", (url, kind))
+
+    def read(self, sha):
+        return read_snapshot(self.root, sha)
+
+    def pages(self, url, kind):
+        """
+        Returns [(page, sha, partial)] for one URL and kind, in page order.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page, sha, partial FROM snapshots WHERE url = ? AND kind = ? ORDER BY page",
+                (url, kind),
+            ).fetchall()
+        return [(page, sha, bool(partial)) for page, sha, partial in rows]
+
+    def entries(self, kind):
+        """
+        Returns [(url, page, sha)] for every snapshot of one kind.
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT url, page, sha FROM snapshots WHERE kind = ? ORDER BY url, page", (kind,)
+            ).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
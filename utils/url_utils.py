@@ -0,0 +1,23 @@
+# utils/url_utils.py
+
+import re
+
+SKU_QUERY_PATTERN = re.compile(r"[?&]skuId=(\d+)")
+SKU_PATH_PATTERN = re.compile(r"/(\d+)\.p(?:$|[?#])")
+
+def sku_from_url(url):
+    """
+    Extracts the BestBuy SKU from a product URL, e.g.
+    ".../6613861.p?skuId=6613861" -> "6613861". Returns None if absent.
+    """
+    if not url:
+        return None
+    match = SKU_QUERY_PATTERN.search(url) or SKU_PATH_PATTERN.search(url)
+    return match.group(1) if match else None
+
+def product_key(product):
+    """
+    Stable identity for a product dict: SKU when the URL has one, else the URL, else the name.
+    """
+    url = product.get("product_url") or product.get("url")
+    return sku_from_url(url) or url or product.get("name")
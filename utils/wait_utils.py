@@ -1,23 +1,215 @@
 # utils/wait_utils.py
 
+import time
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
 import logging
 
-def wait_for_element(driver, by_locator, timeout=20):
+POLL_FREQUENCY = 0.1
+
+# Records the time of the last DOM mutation on `window` so quiet periods can be
+# polled cheaply. Installing twice is a no-op.
+DOM_OBSERVER_JS = """
+if (!window.__scraperLastMutation) {
+    window.__scraperLastMutation = Date.now();
+    new MutationObserver(() => { window.__scraperLastMutation = Date.now(); })
+        .observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+}
+return Date.now() - window.__scraperLastMutation;
+"""
+
+
+class WaitBudget:
+    """
+    Wall-clock time budget shared by every wait on one product page.
+
+    `timeout(cap)` hands out the smaller of `cap` and what is left, so a slow
+    page can never stall a worker for longer than the budget.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.started = time.monotonic()
+
+    def remaining(self):
+        return max(0.0, self.seconds - (time.monotonic() - self.started))
+
+    def timeout(self, cap):
+        return min(cap, self.remaining())
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+
+class _AbsentMarkerFound(Exception):
+    pass
+
+
+def _budgeted(timeout, budget):
+    return budget.timeout(timeout) if budget else timeout
+
+
+def wait_for_element(driver, by_locator, timeout=20, absent_locators=None, budget=None):
     """
     Waits for an element to be present in the DOM.
 
     :param driver: Selenium WebDriver instance
     :param by_locator: Tuple(By.<METHOD>, 'locator_string')
     :param timeout: Maximum wait time in seconds
+    :param absent_locators: Locators whose presence proves the element will never
+                            appear (e.g. a "no reviews yet" message); returns None
+                            as soon as one is found instead of waiting out the timeout
+    :param budget: Optional WaitBudget capping the timeout
     :return: WebElement if found
     """
+    timeout = _budgeted(timeout, budget)
+
+    def condition(d):
+        # find_elements (not presence_of_element_located, whose NoSuchElementException
+        # WebDriverWait swallows) so the absent markers are checked on every poll
+        found = d.find_elements(*by_locator)
+        if found:
+            return found[0]
+        for marker in absent_locators or ():
+            if d.find_elements(*marker):
+                raise _AbsentMarkerFound(marker)
+        return False
+
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(condition)
+    except _AbsentMarkerFound as marker:
+        logging.info(f"Element {by_locator} absent: found marker {marker}.")
+        return None
+    except TimeoutException:
+        logging.error(f"Timeout: Element {by_locator} not found within {timeout:.1f} seconds.")
+        return None
+
+
+def wait_for_any(driver, by_locators, timeout=20, budget=None):
+    """
+    Waits for the first of several locators to match.
+
+    :return: (index, WebElement) of the first match, or (None, None) on timeout
+    """
+    timeout = _budgeted(timeout, budget)
+
+    def condition(d):
+        for idx, locator in enumerate(by_locators):
+            found = d.find_elements(*locator)
+            if found:
+                return idx, found[0]
+        return False
+
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(condition)
+    except TimeoutException:
+        logging.warning(f"Timeout: none of {by_locators} found within {timeout:.1f} seconds.")
+        return None, None
+
+
+def wait_for_staleness(driver, element, timeout=10, budget=None):
+    """
+    Waits until `element` is detached from the DOM (e.g. after navigation or a re-render).
+
+    :return: True if the element went stale, False on timeout
+    """
+    timeout = _budgeted(timeout, budget)
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(EC.staleness_of(element))
+    except TimeoutException:
+        logging.warning(f"Timeout: element did not go stale within {timeout:.1f} seconds.")
+        return False
+
+
+def wait_for_invisibility(driver, by_locator, timeout=10, budget=None):
+    """
+    Waits until no element matching `by_locator` is visible.
+    """
+    timeout = _budgeted(timeout, budget)
+    try:
+        return bool(WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(
+            EC.invisibility_of_element_located(by_locator)
+        ))
+    except TimeoutException:
+        logging.warning(f"Timeout: {by_locator} still visible after {timeout:.1f} seconds.")
+        return False
+
+
+def wait_for_value_change(driver, script, previous_value, timeout=10, budget=None):
+    """
+    Waits until `driver.execute_script(script)` returns something other than `previous_value`.
+
+    :return: The new value, or `previous_value` on timeout
+    """
+    timeout = _budgeted(timeout, budget)
+
+    def condition(d):
+        value = d.execute_script(script)
+        return (value,) if value != previous_value else False
+
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(condition)[0]
+    except TimeoutException:
+        return previous_value
+
+
+def wait_for_replacement(driver, by_locator, old_element, old_text=None, timeout=15, budget=None):
+    """
+    Waits until the list rooted at `by_locator` is re-rendered, i.e. `old_element`
+    (typically its first item) is no longer the first match, and the new list has
+    at least one item. Pass `old_text` to also accept a list whose nodes were
+    reused in place but whose first item now reads differently.
+
+    :return: The new first element, or None on timeout
+    """
+    timeout = _budgeted(timeout, budget)
+
+    def condition(d):
+        found = d.find_elements(*by_locator)
+        if not found:
+            return False
+        if found[0] != old_element:
+            return found[0]
+        if old_text is not None and found[0].text != old_text:
+            return found[0]
+        return False
+
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY,
+                             ignored_exceptions=(StaleElementReferenceException,)).until(condition)
+    except TimeoutException:
+        logging.warning(f"Timeout: {by_locator} was not replaced within {timeout:.1f} seconds.")
+        return None
+
+
+def wait_for_page_ready(driver, timeout=15, interactive=True, budget=None):
+    """
+    Waits for `document.readyState` to reach "interactive" (or "complete").
+    """
+    timeout = _budgeted(timeout, budget)
+    accepted = ("interactive", "complete") if interactive else ("complete",)
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(
+            lambda d: d.execute_script("return document.readyState;") in accepted
+        )
+    except TimeoutException:
+        logging.warning(f"Timeout: page not ready within {timeout:.1f} seconds.")
+        return False
+
+
+def wait_for_dom_quiet(driver, quiet_ms=500, timeout=10, budget=None):
+    """
+    Waits until the DOM has gone `quiet_ms` milliseconds without a mutation.
+
+    :return: True once quiet, False on timeout
+    """
+    timeout = _budgeted(timeout, budget)
     try:
-        return WebDriverWait(driver, timeout).until(
-            EC.presence_of_element_located(by_locator)  # ✅ FIXED
+        return WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(
+            lambda d: d.execute_script(DOM_OBSERVER_JS) >= quiet_ms
         )
     except TimeoutException:
-        logging.error(f"Timeout: Element {by_locator} not found within {timeout} seconds.")
-        return None
\ No newline at end of file
+        logging.info(f"DOM still changing after {timeout:.1f} seconds; continuing.")
+        return False